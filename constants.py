@@ -1,34 +1,395 @@
 import os
-from dotenv import load_dotenv
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+import sys
+import json
+import base64
+import atexit
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import cache, lru_cache, wraps
 
-load_dotenv()
+# The Google client libraries are imported inside the factories below: they pull
+# in dozens of modules that plain `import constants` should not pay for.
 
-# Configuration
-GOOGLE_CREDENTIALS_FILE = os.getenv('GOOGLE_CREDENTIALS_FILE')
-WP_URL = os.getenv('WP_URL')
-WP_USER = os.getenv('WP_USER')
-WP_PASSWORD = os.getenv('WP_PASSWORD')
+ENV_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
+
+# Survives importlib.reload(), which re-executes this module in the same namespace
+_ENV_LOADED = globals().get('_ENV_LOADED', False)
+
+def _load_env():
+    """Load `.env` into os.environ; repeat calls (e.g. module reloads) are no-ops."""
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+    # In production the orchestrator provides the environment, so neither
+    # the compiled module nor .env is looked for.
+    if os.environ.get('APP_ENV', 'development') == 'production':
+        _ENV_LOADED = True
+        return
+    try:
+        # Generated by scripts/compile_env.py; avoids parsing .env at runtime
+        from _env_compiled import ENV
+    except ImportError:
+        if os.path.exists(ENV_FILE):
+            from dotenv import load_dotenv
+            load_dotenv(ENV_FILE, override=False)
+    else:
+        for key, value in ENV.items():
+            os.environ.setdefault(key, value)
+    _ENV_LOADED = True
+
+_load_env()
+
+# Configuration, read from the environment once at import time
+@dataclass(frozen=True)
+class Config:
+    __slots__ = ('wp_url', 'wp_user', 'wp_password', 'verify_posts',
+                 'google_credentials_file', 'google_credentials_b64',
+                 'doc_cache_ttl')
+    wp_url: str
+    wp_user: str
+    wp_password: str
+    # Read each created post back from WordPress instead of checking the
+    # response to the create request
+    verify_posts: bool
+    google_credentials_file: str
+    google_credentials_b64: str
+    doc_cache_ttl: int
+
+# Required settings and credentials, in the order _read_config unpacks them
+REQUIRED_ENV_VARS = ('WP_URL', 'WP_USER', 'WP_PASSWORD')
+# The service-account key may come from a file or, base64-encoded, from the environment
+CREDENTIAL_ENV_VARS = ('GOOGLE_CREDENTIALS_FILE', 'GOOGLE_CREDENTIALS_B64')
+# How long (seconds) a cached headlines/cutlines parse is reused
+DEFAULT_DOC_CACHE_TTL = 7 * 24 * 60 * 60
+
+def _read_config(environ):
+    """Build the Config, reporting every missing variable at once instead of failing later."""
+    values = [environ.get(name) for name in REQUIRED_ENV_VARS + CREDENTIAL_ENV_VARS]
+    missing = [name for name, value in zip(REQUIRED_ENV_VARS, values) if not value]
+    if not any(environ.get(name) for name in CREDENTIAL_ENV_VARS):
+        missing.append(' or '.join(CREDENTIAL_ENV_VARS))
+    if missing:
+        raise RuntimeError(
+            f"Missing required environment variables: {', '.join(missing)}. "
+            "Set them in .env (see README.md)."
+        )
+    try:
+        doc_cache_ttl = int(environ.get('DOC_CACHE_TTL', DEFAULT_DOC_CACHE_TTL))
+    except ValueError:
+        raise RuntimeError(
+            f"DOC_CACHE_TTL must be a whole number of seconds, got {environ['DOC_CACHE_TTL']!r}."
+        ) from None
+    wp_url, wp_user, wp_password, credentials_file, credentials_b64 = values
+    return Config(
+        wp_url=wp_url,
+        wp_user=wp_user,
+        wp_password=wp_password,
+        verify_posts=environ.get('VERIFY_POSTS', '').lower() in ('1', 'true', 'yes'),
+        google_credentials_file=credentials_file,
+        google_credentials_b64=credentials_b64,
+        doc_cache_ttl=doc_cache_ttl
+    )
+
+CONFIG = _read_config(os.environ)
 
 # Google Sheets green color (normalized to 0-1 range)
 GREEN_COLOR = {'red': 0.5764706, 'green': 0.76862746, 'blue': 0.49019608}
 
-# Google API setup
-SCOPES = ['https://www.googleapis.com/auth/spreadsheets',
-          'https://www.googleapis.com/auth/drive',
-          'https://www.googleapis.com/auth/documents.readonly']
-creds = service_account.Credentials.from_service_account_file(
-    GOOGLE_CREDENTIALS_FILE, scopes=SCOPES)
-sheets_service = build('sheets', 'v4', credentials=creds)
-docs_service = build('docs', 'v1', credentials=creds)
-drive_service = build('drive', 'v3', credentials=creds)
-
-# ANSI color codes
-GREEN = "\033[92m"
-YELLOW = "\033[93m"
-RED = "\033[91m"
-BLUE = "\033[94m"
-ENDC = "\033[0m"
-BOLD = "\033[1m"
-ORANGE = "\033[33m"
+# Google API setup. Each client only asks for the scope it needs.
+SHEETS_SCOPES = ('https://www.googleapis.com/auth/spreadsheets',)
+DOCS_SCOPES = ('https://www.googleapis.com/auth/documents.readonly',)
+DRIVE_SCOPES = ('https://www.googleapis.com/auth/drive.readonly',)
+SCOPES = SHEETS_SCOPES + DRIVE_SCOPES + DOCS_SCOPES
+
+# Per-user cache directory (access tokens, parsed documents)
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cigar-autopost')
+
+def _build(name, version, scopes):
+    """Build a Google API client from the discovery document bundled with the library."""
+    from googleapiclient.discovery import build
+    return build(name, version, http=get_authorized_http(scopes),
+                 static_discovery=True, cache_discovery=False)
+
+# The cached factories below are first called from worker threads as well as
+# the main thread. functools caches do not stop two threads that miss at the
+# same time from each building a value (and, for credentials, each starting a
+# token refresh and its own chain of refresh timers), so calls are serialized
+# under one lock. It is re-entrant because the factories call each other.
+_factory_lock = threading.RLock()
+
+def _locked(factory):
+    """Serialize calls to a cached factory; its cache_info() stays available."""
+    @wraps(factory)
+    def wrapper(*args, **kwargs):
+        with _factory_lock:
+            return factory(*args, **kwargs)
+    wrapper.cache_info = factory.cache_info
+    return wrapper
+
+# Access tokens are persisted between runs and refreshed shortly before they
+# expire, so the token endpoint round trip stays off the critical path. The
+# cache file maps "<service account> <scopes>" to that credential's token.
+TOKEN_CACHE_PATH = os.path.join(CACHE_DIR, 'token.json')
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+_token_cache_lock = threading.Lock()
+@_locked
+@cache
+def _token_request():
+    # Token refreshes share one session so the connection to oauth2.googleapis.com is reused
+    import requests
+    from google.auth.transport.requests import Request
+    return Request(session=requests.Session())
+
+def _utcnow():
+    # google-auth stores expiry as a naive UTC datetime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def _token_cache_key(creds):
+    return f"{creds.service_account_email} {' '.join(sorted(creds.scopes or []))}"
+
+def _read_token_cache():
+    try:
+        with open(TOKEN_CACHE_PATH) as fh:
+            cached = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return cached if isinstance(cached, dict) else {}
+
+def _restore_token(creds):
+    """Reuse a persisted access token if it belongs to these credentials and is still fresh."""
+    entry = _read_token_cache().get(_token_cache_key(creds))
+    try:
+        expiry = datetime.fromisoformat(entry['expiry'])
+        token = entry['token']
+    except (ValueError, KeyError, TypeError):
+        return
+    if expiry - _utcnow() > TOKEN_REFRESH_MARGIN:
+        creds.token = token
+        creds.expiry = expiry
+
+def _store_token(creds):
+    with _token_cache_lock:
+        cached = _read_token_cache()
+        cached[_token_cache_key(creds)] = {
+            'token': creds.token,
+            'expiry': creds.expiry.isoformat(),
+        }
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            fd = os.open(TOKEN_CACHE_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(cached, fh)
+        except OSError as e:
+            print(f"Could not cache Google access token: {e}")
+
+def _schedule_token_refresh(creds):
+    delay = (creds.expiry - _utcnow() - TOKEN_REFRESH_MARGIN).total_seconds()
+    timer = threading.Timer(max(delay, 0), _refresh_token, args=(creds,))
+    timer.daemon = True
+    timer.start()
+
+def refresh_credentials(creds):
+    """Refresh `creds` through the shared token-endpoint session."""
+    creds.refresh(_token_request())
+
+def _refresh_token(creds):
+    """Refresh and persist the access token, then schedule the next refresh."""
+    try:
+        refresh_credentials(creds)
+    except Exception as e:
+        print(f"Could not refresh Google access token: {e}")
+        return
+    _store_token(creds)
+    _schedule_token_refresh(creds)
+
+# Google clients are built lazily on first use so that importing this module
+# does not parse the service-account key or fetch discovery documents.
+@_locked
+@lru_cache(maxsize=1)
+def _load_credentials(path, mtime):
+    """Parse the service-account key file; `mtime` only keys the cache."""
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(path)
+
+@_locked
+@lru_cache(maxsize=1)
+def _load_credentials_b64(encoded):
+    """Parse a base64-encoded service-account key without touching the filesystem."""
+    from google.oauth2 import service_account
+    info = json.loads(base64.b64decode(encoded))
+    return service_account.Credentials.from_service_account_info(info)
+
+def _base_credentials():
+    # GOOGLE_CREDENTIALS_B64 wins over GOOGLE_CREDENTIALS_FILE; a key file is
+    # re-parsed only if it changed.
+    if CONFIG.google_credentials_b64:
+        return _load_credentials_b64(CONFIG.google_credentials_b64)
+    path = CONFIG.google_credentials_file
+    return _load_credentials(path, os.path.getmtime(path))
+
+@_locked
+@lru_cache(maxsize=8)
+def _scoped_credentials(base, scopes):
+    # with_scopes() reuses the already-parsed signer
+    creds = base.with_scopes(list(scopes))
+    _restore_token(creds)
+    if creds.token:
+        _schedule_token_refresh(creds)
+    else:
+        _refresh_token(creds)
+    return creds
+
+def get_credentials(scopes=SCOPES):
+    """Return service-account credentials restricted to `scopes` (a tuple)."""
+    return _scoped_credentials(_base_credentials(), tuple(scopes))
+
+def _new_http():
+    from googleapiclient.http import build_http
+    return build_http()
+
+@_locked
+@cache
+def _shared_http():
+    # One connection pool to googleapis.com for every client on the main thread.
+    return _new_http()
+
+@_locked
+@cache
+def get_authorized_http(scopes=SCOPES):
+    """
+    Return an authorized transport for `scopes`. All transports wrap the same
+    httplib2.Http, so the Sheets, Docs and Drive clients share keep-alive
+    connections even though their tokens differ.
+    """
+    import google_auth_httplib2
+    return google_auth_httplib2.AuthorizedHttp(get_credentials(scopes), http=_shared_http())
+
+_authorized_sessions = []  # Closed by shutdown()
+
+@_locked
+@cache
+def get_authorized_session(scopes=SCOPES):
+    """
+    Return a requests AuthorizedSession for `scopes`, for calls that go
+    straight to a REST endpoint instead of through a discovery client.
+    Unlike httplib2, the session's connection pool is safe to share between
+    threads.
+    """
+    from google.auth.transport.requests import AuthorizedSession
+    session = AuthorizedSession(get_credentials(scopes))
+    _authorized_sessions.append(session)
+    return session
+
+_thread_transports = threading.local()
+
+def get_thread_http(scopes=SCOPES):
+    """
+    Return an authorized transport for `scopes` private to the calling thread.
+    httplib2.Http is not thread-safe, so worker threads get their own
+    connection; the main thread keeps using get_authorized_http(). Pass the
+    result to request.execute(http=...).
+    """
+    if threading.current_thread() is threading.main_thread():
+        return get_authorized_http(scopes)
+    transports = _thread_transports.__dict__.setdefault('by_scopes', {})
+    if scopes not in transports:
+        import google_auth_httplib2
+        transports[scopes] = google_auth_httplib2.AuthorizedHttp(get_credentials(scopes), http=_new_http())
+    return transports[scopes]
+
+@_locked
+@cache
+def get_sheets_service():
+    """Return the shared Google Sheets API client."""
+    return _build('sheets', 'v4', SHEETS_SCOPES)
+
+@_locked
+@cache
+def get_docs_service():
+    """Return the shared Google Docs API client."""
+    return _build('docs', 'v1', DOCS_SCOPES)
+
+@_locked
+@cache
+def get_drive_service():
+    """Return the shared Google Drive API client."""
+    return _build('drive', 'v3', DRIVE_SCOPES)
+
+def shutdown():
+    """Close the HTTP connections held by whichever Google clients were built."""
+    for accessor in (get_sheets_service, get_docs_service, get_drive_service):
+        if accessor.cache_info().currsize:
+            try:
+                accessor().close()
+            except Exception:
+                pass
+    for session in _authorized_sessions:
+        session.close()
+    if _token_request.cache_info().currsize:
+        _token_request().session.close()
+
+atexit.register(shutdown)
+
+# Google only accepts batches addressed to a single API, so batches are made per
+# service rather than across Sheets/Docs/Drive.
+BATCH_SIZE_LIMIT = 50
+
+def make_batch(service, callback=None):
+    """Return a new BatchHttpRequest for one of the services above."""
+    return service.new_batch_http_request(callback=callback)
+
+def execute_batch(service, requests_by_id):
+    """
+    Execute many requests against one service in as few HTTP round trips as possible.
+    `requests_by_id` maps a request ID to an HttpRequest. Returns a dictionary
+    mapping each ID to its response, or to the exception raised for it.
+    """
+    results = {}
+
+    def collect(request_id, response, exception):
+        results[request_id] = exception if exception is not None else response
+
+    items = list(requests_by_id.items())
+    for start in range(0, len(items), BATCH_SIZE_LIMIT):
+        batch = make_batch(service, callback=collect)
+        for request_id, request in items[start:start + BATCH_SIZE_LIMIT]:
+            batch.add(request, request_id=request_id)
+        batch.execute()
+    return results
+
+_LAZY_ATTRIBUTES = {
+    'creds': get_credentials,
+    'sheets_service': get_sheets_service,
+    'docs_service': get_docs_service,
+    'drive_service': get_drive_service,
+}
+
+def __getattr__(name):
+    """Keep `constants.sheets_service` etc. working for older callers."""
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ANSI color codes, disabled when output is redirected or NO_COLOR is set
+# (https://no-color.org). Use as f"{C.GREEN}...{C.ENDC}".
+class _Colors:
+    __slots__ = ('GREEN', 'YELLOW', 'RED', 'BLUE', 'ENDC', 'BOLD', 'ORANGE')
+
+    def __init__(self):
+        self.GREEN = "\033[92m"
+        self.YELLOW = "\033[93m"
+        self.RED = "\033[91m"
+        self.BLUE = "\033[94m"
+        self.ENDC = "\033[0m"
+        self.BOLD = "\033[1m"
+        self.ORANGE = "\033[33m"
+
+    def disable(self):
+        """Turn every color code into an empty string (e.g. for --no-color)."""
+        for name in self.__slots__:
+            setattr(self, name, "")
+
+C = _Colors()
+if not sys.stdout.isatty() or 'NO_COLOR' in os.environ:
+    C.disable()
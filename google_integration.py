@@ -1,17 +1,212 @@
 import re
 import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from functools import lru_cache, wraps
+from concurrent.futures import Future, ThreadPoolExecutor
 import sys
 import termios
 import tty
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.http import MediaIoBaseDownload
-from googleapiclient.errors import HttpError
+# Lets the redaction start prompt pre-fill input() with the first digit;
+# missing from some minimal Python builds
+try:
+    import readline
+except ImportError:
+    readline = None
 
 from constants import (
-    sheets_service, docs_service, GREEN, YELLOW, BLUE, ENDC, BOLD
+    get_sheets_service, get_docs_service, get_thread_http, DOCS_SCOPES, CACHE_DIR, CONFIG, C
 )
 
+log = logging.getLogger(__name__)
+
+# Patterns used on every spreadsheet cell / URL, compiled once at import
+_URL_RE = re.compile(r'https?://\S+')
+_SHEET_ID_RE = re.compile(r"/d/([a-zA-Z0-9_-]+)")
+
+# Cutlines document lines: "SECTION:" category markers and
+# "[*]identifier: cutline text [PHOTO CREDIT(S): credit]" entries. The credit
+# marker is a whole-word "PHOTO CREDIT" or "PHOTO CREDITS", with or without
+# a colon; in any other case ("Photo credit:") it needs the colon, so prose
+# is left alone:
+#   "x: Text PHOTO CREDITS: A, B"   -> 'Text', credit 'A, B'
+#   "x: Text Photo credit: Bob"     -> 'Text', credit 'Bob'
+#   "x: the photo credited to bob"  -> no credit
+#   "x: a photo credit b"           -> no credit
+# RE2 (pip install google-re2) matches these in linear time and is used
+# when installed; the patterns are valid for both engines.
+try:
+    import re2 as _cutline_re
+except ImportError:
+    _cutline_re = re
+_CATEGORY_RE = _cutline_re.compile(r'([^:]*):')
+_CUTLINE_RE = _cutline_re.compile(
+    r'\*?\s*(?P<id>[^:]*):\s*(?P<text>.*?)'
+    r'(?:\s*(?:\bPHOTO CREDITS?\b|\b(?i:photo credits?)\s*:)[: ]*(?P<credit>.*))?$'
+)
+
+# Rows 1-7 of the sheet are headers; stories start on row 8.
+# Plain text is read through the values API; only the columns that can hold
+# links (E: story, N: image, P: headlines, Q: cutlines) of eligible rows are
+# fetched as grid data, and only the fields _extract_url looks at.
+FIRST_DATA_ROW = 8
+TEXT_RANGES = ('A8:E', 'H8:H', 'O8:O')
+LINK_FIELDS = "sheets(data(rowData(values(formattedValue,hyperlink,textFormatRuns(format(link(uri)))))))"
+
+def _extract_url(cell):
+    """
+    Return the first URL found in a spreadsheet cell, or None.
+    Checks the cell hyperlink, then rich-text links, then a URL in the text.
+    """
+    url = cell.get('hyperlink')
+    if url:
+        return url
+
+    for run in cell.get('textFormatRuns', ()):
+        link = run.get('format', {}).get('link')
+        if link and 'uri' in link:
+            return link['uri']
+
+    # Most cells hold plain text; skip the regex unless a URL is possible
+    text = cell.get('formattedValue', '')
+    if 'http' not in text:
+        return None
+    url_match = _URL_RE.search(text)
+    return url_match.group() if url_match else None
+
+# Shared stand-in for cells the API left out; never mutated
+_EMPTY = {}
+
+# Formatted values that count as a ticked checkbox
+_TRUE_SET = frozenset(('TRUE', '✓', 'YES', '1'))
+
+def _cell(rows, row_idx, col_idx, default):
+    """Return rows[row_idx][col_idx], or default where the API trimmed it off."""
+    if row_idx < len(rows):
+        row = rows[row_idx]
+        if col_idx < len(row):
+            return row[col_idx]
+    return default
+
+@lru_cache(maxsize=256)
+def _split_csv(text):
+    """
+    Split a comma-separated cell (authors, categories) into a tuple of
+    stripped names; empty cells give an empty tuple. Rows in a section tend to
+    repeat the same text, so the tuples are shared rather than rebuilt.
+    """
+    text = text.strip()
+    if not text:
+        return ()
+    return tuple(name.strip() for name in text.split(','))
+
+def _fetch_sheet_text(sheet_id):
+    """Fetch the formatted text of each range in TEXT_RANGES as lists of rows."""
+    response = get_sheets_service().spreadsheets().values().batchGet(
+        spreadsheetId=sheet_id,
+        ranges=list(TEXT_RANGES),
+        valueRenderOption='FORMATTED_VALUE'
+    ).execute()
+    return [value_range.get('values', []) for value_range in response['valueRanges']]
+
+def _row_runs(row_nums):
+    """Group sorted row numbers into (first, last) runs of consecutive rows."""
+    runs = []
+    for row_num in row_nums:
+        if runs and runs[-1][1] == row_num - 1:
+            runs[-1][1] = row_num
+        else:
+            runs.append([row_num, row_num])
+    return runs
+
+def _fetch_link_cells(sheet_id, row_nums):
+    """
+    Fetch the link-bearing cells (columns E, N, O, P, Q) of the given rows.
+    Neighbouring rows are requested as one range. Returns a dict of
+    row number -> (E cell, [N, O, P, Q cells]).
+    """
+    runs = _row_runs(row_nums)
+    ranges = []
+    for first, last in runs:
+        ranges += [f'E{first}:E{last}', f'N{first}:Q{last}']
+
+    response = get_sheets_service().spreadsheets().get(
+        spreadsheetId=sheet_id,
+        ranges=ranges,
+        includeGridData=True,
+        fields=LINK_FIELDS
+    ).execute()
+    grid_data = response['sheets'][0]['data']
+
+    links = {}
+    for run_idx, (first, last) in enumerate(runs):
+        e_rows = grid_data[2 * run_idx].get('rowData', [])
+        n_to_q_rows = grid_data[2 * run_idx + 1].get('rowData', [])
+        for offset in range(last - first + 1):
+            e_cells = e_rows[offset].get('values', ()) if offset < len(e_rows) else ()
+            n_to_q = n_to_q_rows[offset].get('values', []) if offset < len(n_to_q_rows) else []
+            links[first + offset] = (e_cells[0] if e_cells else _EMPTY, n_to_q)
+    return links
+
+def _build_row(actual_row_num, section, col_e_link, link_cells, author_text, categories_text):
+    """
+    Build the eligible-row dict for a candidate row, or return None if it
+    has no story link.
+    """
+    # Get Story URL (Column E)
+    story_url = _extract_url(col_e_link)
+    if not story_url:
+        log.info("Row %d: ready to post but has no story URL - skipping", actual_row_num)
+        return None
+
+    # Bind the link cells of columns N-Q
+    n = len(link_cells)
+    col_n = link_cells[0] if n > 0 else _EMPTY
+    col_p = link_cells[2] if n > 2 else _EMPTY
+    col_q = link_cells[3] if n > 3 else _EMPTY
+
+    # Get Image URL (Column N)
+    image_url = _extract_url(col_n)
+    log.debug("Row %d: story %s, image %s", actual_row_num, story_url, image_url)
+
+    # Get Author (Column H) and Categories (Column O)
+    author_names = _split_csv(author_text)
+    categories = _split_csv(categories_text)
+
+    # If no categories found (either column missing or empty), use section
+    if not categories:
+        log.debug("Row %d: no categories, using section %s", actual_row_num, section)
+        categories = (section,)
+
+    # Get Headlines document URL (Column P)
+    headlines_url = _extract_url(col_p)
+
+    # Column P holds a photographer name instead on rows without a headlines link
+    photographer_name = None
+    if not headlines_url:
+        photographer_name = col_p.get('formattedValue', '').strip() or None
+
+    # Get Cutlines document URL (Column Q)
+    cutlines_url = _extract_url(col_q)
+
+    log.info("Row %d: eligible (section %s, authors %s, categories %s)",
+             actual_row_num, section, author_names, categories)
+    return {
+        'row': actual_row_num,
+        'doc_url': story_url,
+        'image_url': image_url,
+        'headlines_url': headlines_url,
+        'cutlines_url': cutlines_url,
+        'author_names': author_names,
+        'categories': categories,
+        'photographer_name': photographer_name,
+        'online_cell': f"D{actual_row_num}",
+        'section': section
+    }
+
 def get_eligible_rows(sheet_id):
     """
     Retrieve rows from Google Sheet where:
@@ -19,227 +214,169 @@ def get_eligible_rows(sheet_id):
     - 'Online' (Column D) is NOT checked
     - Track sections from Column A
     """
-    sheet = sheets_service.spreadsheets().get(
-        spreadsheetId=sheet_id,
-        includeGridData=True,
-        fields="sheets(data(rowData(values(formattedValue,effectiveFormat,hyperlink,textFormatRuns,userEnteredFormat.backgroundColor))))"
-    ).execute()
-    rows = sheet['sheets'][0]['data'][0]['rowData']
+    a_to_e, col_h, col_o = _fetch_sheet_text(sheet_id)
 
-    eligible_rows = []
+    # First pass over the plain text: track sections and pick out the rows
+    # that are ready but not yet online
+    candidates = []
     current_section = "Uncategorized"  # Default section
-    
-    for row_idx, row in enumerate(rows[7:]):  # Skip header rows
-        try:
-            actual_row_num = row_idx + 8  # Actual row number in spreadsheet
-            print(f"\nAnalyzing Row {actual_row_num}:")
-            
-            # Skip empty rows
-            if not row.get('values'):
-                print(f"Row {actual_row_num}: Empty row - skipping")
-                continue
-            
-            values = row.get('values', [])
-            
-            # Check if this is a section header in Column A
-            if len(values) > 0 and 'formattedValue' in values[0]:
-                section_text = values[0].get('formattedValue', '').strip()
-                if section_text and not any('formattedValue' in values[i] for i in [1, 3, 4] if i < len(values)):
-                    # This looks like a section header - no data in columns B, D, E
-                    current_section = section_text
-                    print(f"Row {actual_row_num}: Found section header: {current_section}")
-                    continue  # Skip processing this row as a content item
-            
-            # Debug print for first few columns
-            print(f"Section: {current_section}")
-            print(f"Column B (Ready): {values[1].get('formattedValue', 'Empty') if len(values) > 1 else 'Missing'}")
-            print(f"Column D (Online): {values[3].get('formattedValue', 'Empty') if len(values) > 3 else 'Missing'}")
-            print(f"Column E (Story): {values[4].get('formattedValue', 'Empty') if len(values) > 4 else 'Missing'}")
-
-            # Check Ready to Post status (Column B)
-            ready_cell = values[1].get('formattedValue', '').upper() if len(values) > 1 else ''
-            is_ready = ready_cell in ['TRUE', '✓', 'YES', '1']
-            if not is_ready:
-                print(f"Row {actual_row_num}: Not ready to post ({ready_cell}) - skipping")
-                continue
-
-            # Check Online status (Column D)
-            online_cell = values[3].get('formattedValue', '').upper() if len(values) > 3 else ''
-            is_online = online_cell in ['TRUE', '✓', 'YES', '1']
-            if is_online:
-                print(f"Row {actual_row_num}: Already online - skipping")
-                continue
-
-            # Get Story URL (Column E)
-            story_cell = values[4] if len(values) > 4 else {}
-            story_url = None
-
-            print(f"Row {actual_row_num}: Analyzing story cell (Column E):")
-            print(f"  Cell content: {story_cell}")
-
-            # Method 1: Try to get URL from textFormatRuns
-            if 'textFormatRuns' in story_cell:
-                print(f"  textFormatRuns found")
-                for run in story_cell['textFormatRuns']:
-                    if 'format' in run and 'link' in run['format']:
-                        story_url = run['format']['link']['uri']
-                        print(f"  Found URL from textFormatRuns: {story_url}")
-                        break
+    for row_idx, values in enumerate(a_to_e):
+        # Bind the text columns once; the values API trims trailing blanks
+        n = len(values)
+        col_a = values[0].strip() if n > 0 else ''
+        col_b = values[1] if n > 1 else ''
+        col_d = values[3] if n > 3 else ''
+        col_e = values[4] if n > 4 else ''
+
+        # Check if this is a section header in Column A (no data in columns B, D, E)
+        if col_a and not (col_b or col_d or col_e):
+            current_section = col_a
+            log.debug("Row %d: found section header: %s", row_idx + FIRST_DATA_ROW, current_section)
+            continue
 
-            # Method 2: Try to get URL from hyperlink property
-            if not story_url and 'hyperlink' in story_cell:
-                story_url = story_cell['hyperlink']
-                print(f"  Found URL from hyperlink property: {story_url}")
-
-            # Method 3: Look for URL patterns in text
-            if not story_url and 'formattedValue' in story_cell:
-                url_match = re.search(r'https?://[^\s]+', story_cell['formattedValue'])
-                if url_match:
-                    story_url = url_match.group()
-                    print(f"  Found URL from text pattern: {story_url}")
-
-            if not story_url:
-                print(f"  No valid story URL found - skipping")
-                continue
-
-            print(f"  Using URL: {story_url}")
-
-            # Get Image URL (Column N)
-            image_url = None
-            if len(values) > 13:  # Column N is index 13
-                image_cell = values[13]
-                print(f"Row {actual_row_num}: Analyzing image cell (Column N):")
-                print(f"  Cell content: {image_cell}")
-
-                # Method 1: Try to get URL from textFormatRuns
-                if 'textFormatRuns' in image_cell:
-                    print(f"  textFormatRuns found in image cell")
-                    for run in image_cell['textFormatRuns']:
-                        if 'format' in run and 'link' in run['format']:
-                            image_url = run['format']['link']['uri']
-                            print(f"  Found image URL from textFormatRuns: {image_url}")
-                            break
+        if col_b.upper() not in _TRUE_SET or col_d.upper() in _TRUE_SET:
+            continue
 
-                # Method 2: Try to get URL from hyperlink property
-                if not image_url and 'hyperlink' in image_cell:
-                    image_url = image_cell['hyperlink']
-                    print(f"  Found image URL from hyperlink property: {image_url}")
-
-                # Method 3: Look for URL patterns in text
-                if not image_url and 'formattedValue' in image_cell:
-                    url_match = re.search(r'https?://[^\s]+', image_cell['formattedValue'])
-                    if url_match:
-                        image_url = url_match.group()
-                        print(f"  Found image URL from text pattern: {image_url}")
-            else:
-                print(f"Row {actual_row_num}: Story has no featured image.")
-
-            # Get Author (Column H)
-            author_cell = values[7] if len(values) > 7 else None
-            author_names = []
-            if author_cell and 'formattedValue' in author_cell:
-                author_name = author_cell.get('formattedValue', '').strip()
-                if author_name:
-                    author_names = [name.strip() for name in author_name.split(',')]
-                    print(f"Row {actual_row_num}: Found author(s): {', '.join(author_names)}")
-
-            # Get Categories (Column O)
-            categories = []
-            if len(values) > 14:  # Column O exists
-                categories_cell = values[14]
-                if categories_cell and 'formattedValue' in categories_cell:
-                    categories_text = categories_cell.get('formattedValue', '').strip()
-                    if categories_text:
-                        categories = [cat.strip() for cat in categories_text.split(',')]
-                        print(f"Row {actual_row_num}: Found categories: {', '.join(categories)}")
-
-            # If no categories found (either column missing or empty), use section
-            if not categories:
-                print(f"Row {actual_row_num}: No categories found. Setting to default section category: {current_section}")
-                categories = [current_section]
-                
-            # Get Photographer info (Column P)
-            photographer_name = None
-            if len(values) > 15:  # Column P is index 15
-                photographer_cell = values[15]
-                if photographer_cell and 'formattedValue' in photographer_cell:
-                    photographer_name = photographer_cell.get('formattedValue', '').strip()
-                    if photographer_name:
-                        print(f"Row {actual_row_num}: Found photographer: {photographer_name}")
-
-            # Get Headlines document URL (Column P)
-            headlines_url = None
-            if len(values) > 15:  # Column P is index 15
-                headlines_cell = values[15]
-                print(f"Row {actual_row_num}: Analyzing headlines cell (Column P):")
-                
-                # Method 1: Try to get URL from textFormatRuns
-                if 'textFormatRuns' in headlines_cell:
-                    for run in headlines_cell['textFormatRuns']:
-                        if 'format' in run and 'link' in run['format']:
-                            headlines_url = run['format']['link']['uri']
-                            print(f"  Found headlines URL from textFormatRuns: {headlines_url}")
-                            break
+        # A story link needs link text in Column E
+        if not col_e:
+            log.info("Row %d: ready to post but has no story URL - skipping", row_idx + FIRST_DATA_ROW)
+            continue
 
-                # Method 2: Try to get URL from hyperlink property
-                if not headlines_url and 'hyperlink' in headlines_cell:
-                    headlines_url = headlines_cell['hyperlink']
-                    print(f"  Found headlines URL from hyperlink property: {headlines_url}")
-
-                # Method 3: Look for URL patterns in text
-                if not headlines_url and 'formattedValue' in headlines_cell:
-                    url_match = re.search(r'https?://[^\s]+', headlines_cell['formattedValue'])
-                    if url_match:
-                        headlines_url = url_match.group()
-                        print(f"  Found headlines URL from text pattern: {headlines_url}")
-            
-            # Get Cutlines document URL (Column Q)
-            cutlines_url = None
-            if len(values) > 16:  # Column Q is index 16
-                cutlines_cell = values[16]
-                print(f"Row {actual_row_num}: Analyzing cutlines cell (Column Q):")
-                
-                # Method 1: Try to get URL from textFormatRuns
-                if 'textFormatRuns' in cutlines_cell:
-                    for run in cutlines_cell['textFormatRuns']:
-                        if 'format' in run and 'link' in run['format']:
-                            cutlines_url = run['format']['link']['uri']
-                            print(f"  Found cutlines URL from textFormatRuns: {cutlines_url}")
-                            break
+        candidates.append((row_idx, current_section))
 
-                # Method 2: Try to get URL from hyperlink property
-                if not cutlines_url and 'hyperlink' in cutlines_cell:
-                    cutlines_url = cutlines_cell['hyperlink']
-                    print(f"  Found cutlines URL from hyperlink property: {cutlines_url}")
-
-                # Method 3: Look for URL patterns in text
-                if not cutlines_url and 'formattedValue' in cutlines_cell:
-                    url_match = re.search(r'https?://[^\s]+', cutlines_cell['formattedValue'])
-                    if url_match:
-                        cutlines_url = url_match.group()
-                        print(f"  Found cutlines URL from text pattern: {cutlines_url}")
-
-            # Add to eligible rows
-            print(f"Row {actual_row_num}: Adding to eligible rows (Section: {current_section})")
-            eligible_rows.append({
-                'row': actual_row_num,
-                'doc_url': story_url,
-                'image_url': image_url,
-                'headlines_url': headlines_url,
-                'cutlines_url': cutlines_url,
-                'author_names': author_names,
-                'categories': categories,
-                'photographer_name': photographer_name,
-                'online_cell': f"D{actual_row_num}",
-                'section': current_section
-            })
+    if not candidates:
+        return []
+
+    # Second pass: fetch link cells for the candidate rows only
+    links = _fetch_link_cells(sheet_id, [row_idx + FIRST_DATA_ROW for row_idx, _ in candidates])
 
+    eligible_rows = []
+    for row_idx, section in candidates:
+        actual_row_num = row_idx + FIRST_DATA_ROW  # Actual row number in spreadsheet
+        try:
+            row = _build_row(actual_row_num, section, *links[actual_row_num],
+                             _cell(col_h, row_idx, 0, ''), _cell(col_o, row_idx, 0, ''))
         except Exception as e:
-            print(f"Error processing row {row_idx + 8}: {str(e)}")
+            # A malformed row is skipped rather than failing the whole sheet
+            log.warning("Row %d: could not be read, skipping: %s", actual_row_num, e)
             continue
+        if row:
+            eligible_rows.append(row)
 
     return eligible_rows
 
+def _para_text(elements):
+    """Concatenate the text runs of a Docs paragraph's elements."""
+    return ''.join(e['textRun']['content'] for e in elements if 'textRun' in e)
+
+# Parallel document downloads; kept low to stay inside the Docs API
+# per-user read quota
+DOC_FETCH_WORKERS = 6
+_DOC_FETCH_POOL = ThreadPoolExecutor(max_workers=DOC_FETCH_WORKERS, thread_name_prefix='doc-fetch')
+
+# Document downloads keyed by (doc_id, include_tabs), as futures so that a
+# caller needing a document that is still downloading waits for that
+# download instead of starting a second one
+_DOC_FUTURES = {}
+_DOC_FUTURES_LOCK = threading.Lock()
+
+def _download_doc(doc_id, include_tabs):
+    return get_docs_service().documents().get(
+        documentId=doc_id,
+        includeTabsContent=include_tabs
+    ).execute(http=get_thread_http(DOCS_SCOPES))
+
+def _doc_future(doc_id, include_tabs, inline=False):
+    """
+    Return the download of a document, starting it (or retrying a failed one)
+    if needed. With inline=True a new download runs in the calling thread
+    rather than queueing behind the pool's backlog.
+    """
+    key = (doc_id, include_tabs)
+    with _DOC_FUTURES_LOCK:
+        future = _DOC_FUTURES.get(key)
+        if future is not None and future.done() and future.exception() is not None:
+            log.warning("Fetching document %s failed, retrying: %s", doc_id, future.exception())
+            future = None
+        if future is not None:
+            return future
+        if not inline:
+            future = _DOC_FUTURES[key] = _DOC_FETCH_POOL.submit(_download_doc, doc_id, include_tabs)
+            return future
+        future = _DOC_FUTURES[key] = Future()
+    try:
+        future.set_result(_download_doc(doc_id, include_tabs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def _fetch_doc(doc_id, include_tabs=False):
+    """
+    Fetch a Google Doc once per run.
+    Headlines and cutlines usually live in the same multi-tab document, so
+    both parsers share the cached response. Callers must not mutate it.
+    A document nobody queued is downloaded straight away, so the headlines
+    and cutlines parses do not wait behind the redaction prefetch.
+    """
+    return _doc_future(doc_id, include_tabs, inline=True).result()
+
+def fetch_docs_async(doc_ids, include_tabs=False):
+    """
+    Start downloading several Google Docs in the background, so the parsers
+    find them already fetched (or in flight) instead of waiting for every
+    download before the first post can be reviewed.
+    """
+    for doc_id in dict.fromkeys(doc_ids):
+        _doc_future(doc_id, include_tabs)
+
+def cancel_doc_fetches():
+    """
+    Cancel the queued document downloads. Called when the run ends (including
+    on ESC or a fatal error), since interpreter exit otherwise waits for every
+    queued download to finish.
+    """
+    _DOC_FETCH_POOL.shutdown(wait=False, cancel_futures=True)
+
+def _iter_doc_lines(content):
+    """Yield the stripped, non-empty paragraph lines of a Docs body's content."""
+    for element in content:
+        para = element.get('paragraph')
+        if para:
+            text = _para_text(para['elements']).strip()
+            if text:
+                yield text
+
+@lru_cache(maxsize=32)
+def _doc_tabs(doc_id):
+    """
+    Flatten the tabs of a Google Doc into a list of
+    {'tab_idx', 'title', 'lines', 'lowers'} dicts, keeping only non-empty
+    lines; 'lowers' holds the same lines lowercased for marker checks.
+    Shared by the headlines and cutlines parsers; callers must not mutate it.
+    """
+    doc = _fetch_doc(doc_id, include_tabs=True)
+    log.debug("Found %d tabs in the document", len(doc['tabs']))
+
+    all_tabs_content = []
+    for tab_idx, tab in enumerate(doc['tabs']):
+        log.debug("Processing tab %d: %s", tab_idx + 1, tab.get('title', 'Unnamed tab'))
+
+        # Skip tabs without document content
+        if 'documentTab' not in tab:
+            continue
+
+        # Extract text from each paragraph in this tab
+        tab_lines = list(_iter_doc_lines(tab['documentTab'].get('body', {}).get('content', [])))
+
+        if tab_lines:
+            all_tabs_content.append({
+                'tab_idx': tab_idx,
+                'title': tab.get('title', f"Tab {tab_idx+1}"),
+                'lines': tab_lines,
+                'lowers': [line.lower() for line in tab_lines]
+            })
+    return all_tabs_content
+
 def get_single_key():
     """Get a single keypress from the user, cross-platform."""
     # Unix implementation
@@ -252,6 +389,75 @@ def get_single_key():
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     return ch
 
+# Parsed headlines/cutlines are kept on disk keyed by the document's
+# revision, so an unchanged document is not downloaded and parsed again on
+# the next run. DOC_CACHE_TTL (seconds) bounds how long an entry is trusted.
+DOC_PARSE_CACHE_DIR = os.path.join(CACHE_DIR, 'docs')
+DOC_PARSE_CACHE_TTL = CONFIG.doc_cache_ttl
+# Part of every cache key; bump it whenever the headline or cutline parsing
+# changes so parses made by older code are not reused
+DOC_PARSE_CACHE_VERSION = 1
+
+# Revision lookups by document ID, as futures like _DOC_FUTURES: the
+# headlines and cutlines parsers usually ask for the same document at once
+_DOC_REVISIONS = {}
+
+def _doc_revision(doc_id):
+    """Return a Google Doc's current revision ID, fetching nothing else and only once per run."""
+    with _DOC_FUTURES_LOCK:
+        future = _DOC_REVISIONS.get(doc_id)
+        fetch = future is None or (future.done() and future.exception() is not None)
+        if fetch:
+            future = _DOC_REVISIONS[doc_id] = Future()
+    if fetch:
+        try:
+            future.set_result(get_docs_service().documents().get(
+                documentId=doc_id,
+                fields='revisionId'
+            ).execute(http=get_thread_http(DOCS_SCOPES))['revisionId'])
+        except Exception as e:
+            future.set_exception(e)
+    return future.result()
+
+def _revision_cached(parse):
+    """
+    Cache a doc_id -> list parser's result on disk, keyed by the parser,
+    DOC_PARSE_CACHE_VERSION, the document and its revision.
+    Empty results (parse errors, missing sections) are not stored.
+    """
+    @wraps(parse)
+    def wrapper(doc_id):
+        try:
+            revision = _doc_revision(doc_id)
+        except Exception as e:
+            log.debug("Could not get revision of document %s: %s", doc_id, e)
+            return parse(doc_id)
+
+        key = hashlib.sha256(f"{parse.__name__}:{DOC_PARSE_CACHE_VERSION}:{doc_id}:{revision}".encode()).hexdigest()
+        path = os.path.join(DOC_PARSE_CACHE_DIR, f"{key}.json")
+        try:
+            if time.time() - os.path.getmtime(path) < DOC_PARSE_CACHE_TTL:
+                with open(path) as fh:
+                    result = json.load(fh)
+                log.info("Document %s unchanged since last run, using cached parse (%d entries)",
+                         doc_id, len(result))
+                return result
+        except (OSError, ValueError):
+            pass
+
+        result = parse(doc_id)
+        if result:
+            try:
+                os.makedirs(DOC_PARSE_CACHE_DIR, exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, 'w') as fh:
+                    json.dump(result, fh)
+                os.replace(tmp_path, path)
+            except (OSError, TypeError) as e:
+                log.debug("Could not cache parse of document %s: %s", doc_id, e)
+        return result
+    return wrapper
+
 def parse_redaction_doc(doc_id):
     """
     Parse redaction document with interactive line selection.
@@ -259,78 +465,77 @@ def parse_redaction_doc(doc_id):
     """
     try:
         # Fetch the Google Doc content
-        doc = docs_service.documents().get(documentId=doc_id).execute()
+        doc = _fetch_doc(doc_id)
         content = doc['body']['content']
         
         # Extract all lines from the document
         all_lines = []
         
         for element in content:
-            if 'paragraph' in element:
-                elements = element['paragraph']['elements']
-                text = ''.join([e.get('textRun', {}).get('content', '') for e in elements])
-                all_lines.append(text.strip())
-        
-        # Remove any empty lines at the beginning
-        while all_lines and not all_lines[0]:
-            all_lines.pop(0)
+            para = element.get('paragraph')
+            if para:
+                text = _para_text(para['elements']).strip()
+                # Skip empty lines at the beginning; later ones keep the line numbering
+                if text or all_lines:
+                    all_lines.append(text)
             
         if not all_lines:
-            print(f"{YELLOW}Warning: Document appears to be empty{ENDC}")
+            print(f"{C.YELLOW}Warning: Document appears to be empty{C.ENDC}")
             return ""
         
         # Display first 9 lines (or fewer if document has fewer lines)
         display_lines = min(9, len(all_lines))
         
-        print(f"\n{BLUE}{BOLD}First {display_lines} lines of the redaction document:{ENDC}")
+        print(f"\n{C.BLUE}{C.BOLD}First {display_lines} lines of the redaction document:{C.ENDC}")
         for i in range(display_lines):
             # Truncate long lines
             display_text = all_lines[i][:100] + "..." if len(all_lines[i]) > 100 else all_lines[i]
             print(f"{i+1}. {display_text}")
         
         # Prompt for redaction start line
-        print(f"\n{BOLD}Where does the redaction start?{ENDC} (default: line 4)")
-        print(f"Press {GREEN}SPACEBAR{ENDC} for default (line 4) or enter a line number:")
+        print(f"\n{C.BOLD}Where does the redaction start?{C.ENDC} (default: line 4)")
+        print(f"Press {C.GREEN}SPACEBAR{C.ENDC} for default (line 4) or enter a line number:")
         
-        # Get user input
-        user_input = ""
+        # Only the first key is read raw so SPACEBAR can pick the default;
+        # a digit is then placed in input()'s line buffer, so the whole line
+        # number, first digit included, can be corrected with Backspace
         start_line = 4  # Default value
-        
-        while True:
+        char = get_single_key()
+        while not (char.isdigit() or char in [' ', '\r', '\n']):
             char = get_single_key()
-            if char == ' ':  # Spacebar = default
-                print(f"Using default starting line: {start_line}")
+
+        user_input = ""
+        if char.isdigit() and readline:
+            readline.set_pre_input_hook(lambda: (readline.insert_text(char), readline.redisplay()))
+            try:
+                user_input = input().strip()
+            finally:
+                readline.set_pre_input_hook()
+        elif char.isdigit():
+            # Without readline the digit cannot be put in the line buffer,
+            # so the whole number is typed (and editable) at a fresh prompt
+            user_input = input("Line number: ").strip()
+
+        while user_input:
+            if user_input.isdigit() and 1 <= int(user_input) <= len(all_lines):
+                start_line = int(user_input)
                 break
-            elif char in ['\r', '\n']:  # Enter = use current input
-                if user_input.isdigit() and 1 <= int(user_input) <= len(all_lines):
-                    start_line = int(user_input)
-                    print(f"Using starting line: {start_line}")
-                    break
-                elif user_input == "":
-                    print(f"Using default starting line: {start_line}")
-                    break
-                else:
-                    print(f"{YELLOW}Invalid input. Please enter a valid line number (1-{len(all_lines)}):{ENDC}")
-                    user_input = ""
-            elif char.isdigit():
-                user_input += char
-                print(char, end="", flush=True)
-            elif char in ['\b', '\x08', '\x7f']:  # Backspace
-                if user_input:
-                    user_input = user_input[:-1]
-                    print("\b \b", end="", flush=True)
+            print(f"{C.YELLOW}Invalid input. Please enter a valid line number (1-{len(all_lines)}):{C.ENDC}")
+            user_input = input().strip()
+
+        print(f"Using starting line: {start_line}" if user_input else f"Using default starting line: {start_line}")
             
         # Create redaction from selected line to end
         start_idx = start_line - 1  # Convert to 0-based index
-        redaction = '\n'.join([line for line in all_lines[start_idx:] if line])
+        redaction = '\n'.join(line for line in all_lines[start_idx:] if line)
         
         # For preview purposes, show the first few lines of redaction
-        preview_lines = redaction.split('\n')[:3]
-        preview_text = '\n'.join(preview_lines)
-        if len(preview_lines) < len(redaction.split('\n')):
+        preview_lines = redaction.split('\n', 3)
+        preview_text = '\n'.join(preview_lines[:3])
+        if len(preview_lines) > 3:
             preview_text += "\n..."
         
-        print(f"\n{BOLD}Redaction content:{ENDC}")
+        print(f"\n{C.BOLD}Redaction content:{C.ENDC}")
         print(f"{preview_text}")
         
         return redaction
@@ -339,6 +544,7 @@ def parse_redaction_doc(doc_id):
         print(f"Error parsing redaction document: {str(e)}")
         return f"Error parsing document: {str(e)}"
 
+@_revision_cached
 def parse_headlines_doc(doc_id):
     """
     Parse headlines document and return a list of headline options.
@@ -349,43 +555,12 @@ def parse_headlines_doc(doc_id):
     """
     try:
         # Fetch the Google Doc content with ALL tabs
-        doc = docs_service.documents().get(
-            documentId=doc_id, 
-            includeTabsContent=True
-        ).execute()
+        doc = _fetch_doc(doc_id, include_tabs=True)
         
         # Check if we have tabs in the document
         if 'tabs' in doc and doc['tabs']:
-            print(f"Found {len(doc['tabs'])} tabs in the document")
-            
             # Extract all lines from each tab in the document
-            all_tabs_content = []
-            
-            for tab_idx, tab in enumerate(doc['tabs']):
-                tab_lines = []
-                print(f"Processing tab {tab_idx + 1}: {tab.get('title', 'Unnamed tab')}")
-                
-                # Skip tabs without document content
-                if 'documentTab' not in tab:
-                    continue
-                    
-                # Get content from this tab
-                tab_content = tab['documentTab'].get('body', {}).get('content', [])
-                
-                # Extract text from each paragraph in this tab
-                for element in tab_content:
-                    if 'paragraph' in element:
-                        elements = element['paragraph']['elements']
-                        text = ''.join([e.get('textRun', {}).get('content', '') for e in elements])
-                        if text.strip():  # Only append non-empty lines
-                            tab_lines.append(text.strip())
-                
-                if tab_lines:
-                    all_tabs_content.append({
-                        'tab_idx': tab_idx,
-                        'title': tab.get('title', f"Tab {tab_idx+1}"),
-                        'lines': tab_lines
-                    })
+            all_tabs_content = _doc_tabs(doc_id)
             
             # Look for the Headlines tab/section in each tab
             headlines = []
@@ -394,8 +569,8 @@ def parse_headlines_doc(doc_id):
             
             for tab_content in all_tabs_content:
                 # Skip the entire tab if it doesn't have relevant content
-                if not any(line.lower() == "headlines" for line in tab_content['lines']) and \
-                   not any(line.lower() == "insides" for line in tab_content['lines']):
+                lowers = tab_content['lowers']
+                if "headlines" not in lowers and "insides" not in lowers:
                     continue
                 
                 current_category = "Uncategorized"
@@ -404,16 +579,16 @@ def parse_headlines_doc(doc_id):
                 in_headlines_section = False
                 
                 # Process each line in the tab
-                for line in tab_content['lines']:
+                for line, lower in zip(tab_content['lines'], lowers):
                     # Check for section markers
-                    if line.lower() == "insides":
-                        print(f"Found Insides section (examples - will be skipped)")
+                    if lower == "insides":
+                        log.debug("Found Insides section (examples - will be skipped)")
                         in_insides_section = True
                         insides_section_found = True
                         continue
                     
-                    if line.lower() == "headlines":
-                        print(f"Found Headlines section in tab '{tab_content['title']}'")
+                    if lower == "headlines":
+                        log.debug("Found Headlines section in tab '%s'", tab_content['title'])
                         in_headlines_section = True
                         in_insides_section = False  # We're past the insides section
                         past_insides_section = True
@@ -428,31 +603,30 @@ def parse_headlines_doc(doc_id):
                         # Check if this is a new section marker (ends with colon)
                         if line.endswith(':'):
                             current_category = line.rstrip(':')
-                            print(f"Found headline category: {current_category}")
+                            log.debug("Found headline category: %s", current_category)
                             continue
                         
                         # Skip empty lines or lines without a colon
-                        if not line or not ':' in line:
+                        colon = line.find(':')
+                        if colon < 0:
                             continue
                             
                         # Parse headline format "identifier: headline text"
-                        parts = line.split(':', 1)
-                        if len(parts) == 2:
-                            identifier = parts[0].strip()
-                            headline_text = parts[1].strip()
-                            
-                            # Handle "SH:" in headline text
-                            if "SH:" in headline_text:
-                                parts = headline_text.split('SH:', 1)
-                                headline_text = f"{parts[0].strip()}: {parts[1].strip()}"
-                            
-                            headlines.append({
-                                'slug': identifier,
-                                'headline': headline_text,
-                                'category': current_category,
-                                'original': line
-                            })
-                            print(f"Found headline: {identifier} - {headline_text}")
+                        identifier = line[:colon].strip()
+                        headline_text = line[colon + 1:].strip()
+                        
+                        # Handle "SH:" in headline text
+                        if "SH:" in headline_text:
+                            parts = headline_text.split('SH:', 1)
+                            headline_text = f"{parts[0].strip()}: {parts[1].strip()}"
+                        
+                        headlines.append({
+                            'slug': identifier,
+                            'headline': headline_text,
+                            'category': current_category,
+                            'original': line
+                        })
+                        log.debug("Found headline: %s - %s", identifier, headline_text)
                 
                 # If we found headlines in this tab, don't check other tabs
                 if headlines_found:
@@ -463,28 +637,28 @@ def parse_headlines_doc(doc_id):
                 for tab_content in all_tabs_content:
                     for i, line in enumerate(tab_content['lines']):
                         if line == "NEWS:":
-                            print(f"Found NEWS: marker in tab '{tab_content['title']}', assuming this is part of Headlines section")
+                            log.debug("Found NEWS: marker in tab '%s', assuming this is part of Headlines section", tab_content['title'])
                             current_category = "NEWS"
                             
                             # Process subsequent lines as headlines
                             for next_line in tab_content['lines'][i+1:]:
-                                if not ':' in next_line or next_line.endswith(':'):
-                                    if next_line.endswith(':'):
-                                        current_category = next_line.rstrip(':')
+                                if next_line.endswith(':'):
+                                    current_category = next_line.rstrip(':')
+                                    continue
+                                colon = next_line.find(':')
+                                if colon < 0:
                                     continue
                                 
-                                parts = next_line.split(':', 1)
-                                if len(parts) == 2:
-                                    identifier = parts[0].strip()
-                                    headline_text = parts[1].strip()
-                                    
-                                    headlines.append({
-                                        'slug': identifier,
-                                        'headline': headline_text,
-                                        'category': current_category,
-                                        'original': next_line
-                                    })
-                                    print(f"Found headline: {identifier} - {headline_text}")
+                                identifier = next_line[:colon].strip()
+                                headline_text = next_line[colon + 1:].strip()
+                                
+                                headlines.append({
+                                    'slug': identifier,
+                                    'headline': headline_text,
+                                    'category': current_category,
+                                    'original': next_line
+                                })
+                                log.debug("Found headline: %s - %s", identifier, headline_text)
                             
                             headlines_found = True
                             break
@@ -492,80 +666,68 @@ def parse_headlines_doc(doc_id):
                         break
             
             if not headlines_found:
-                print(f"{YELLOW}Could not find Headlines section in any tab{ENDC}")
+                print(f"{C.YELLOW}Could not find Headlines section in any tab{C.ENDC}")
                 return []
         else:
             # Fallback to the old method (document without tabs)
-            print("Document doesn't have tabs. Falling back to single document parser.")
-            content = doc['body']['content']
-            
-            all_lines = []
-            
-            for element in content:
-                if 'paragraph' in element:
-                    elements = element['paragraph']['elements']
-                    text = ''.join([e.get('textRun', {}).get('content', '') for e in elements])
-                    if text.strip():  # Only append non-empty lines
-                        all_lines.append(text.strip())
+            log.debug("Document doesn't have tabs. Falling back to single document parser.")
+            all_lines = list(_iter_doc_lines(doc['body']['content']))
             
             # Look for the "Headlines" section anywhere in the document
             headlines_start = None
             headlines = []
             insides_section_found = False
             
+            lowers = [line.lower() for line in all_lines]
+
             # First, check for "Insides" section
-            for i, line in enumerate(all_lines):
-                if line.lower() == "insides":
-                    insides_section_found = True
-                    print("Found Insides section (examples - will be skipped)")
-                    break
+            if "insides" in lowers:
+                insides_section_found = True
+                log.debug("Found Insides section (examples - will be skipped)")
             
             # Look for Headlines section
-            for i, line in enumerate(all_lines):
-                if line.lower() == "headlines":
-                    headlines_start = i + 1
-                    print(f"Found Headlines section at line {headlines_start}")
-                    break
+            if "headlines" in lowers:
+                headlines_start = lowers.index("headlines") + 1
+                log.debug("Found Headlines section at line %d", headlines_start)
             
             # If Headlines found, parse content
             if headlines_start:
                 current_category = "Uncategorized"
                 
-                for line in all_lines[headlines_start:]:
+                for line, lower in zip(all_lines[headlines_start:], lowers[headlines_start:]):
                     # Check for end markers
-                    if line.lower() == "newscast" or line.lower() == "cutlines":
+                    if lower == "newscast" or lower == "cutlines":
                         break
                         
                     # Check if this is a new section marker
                     if line.endswith(':'):
                         current_category = line.rstrip(':')
-                        print(f"Found headline category: {current_category}")
+                        log.debug("Found headline category: %s", current_category)
                         continue
                     
                     # Skip empty lines or lines without a colon
-                    if not line or not ':' in line:
+                    colon = line.find(':')
+                    if colon < 0:
                         continue
                         
                     # Parse headline format
-                    parts = line.split(':', 1)
-                    if len(parts) == 2:
-                        identifier = parts[0].strip()
-                        headline_text = parts[1].strip()
-                        
-                        # Handle "SH:" in headline text
-                        if "SH:" in headline_text:
-                            parts = headline_text.split('SH:', 1)
-                            headline_text = f"{parts[0].strip()}: {parts[1].strip()}"
-                        
-                        headlines.append({
-                            'slug': identifier,
-                            'headline': headline_text,
-                            'category': current_category,
-                            'original': line
-                        })
-                        print(f"Found headline: {identifier} - {headline_text}")
+                    identifier = line[:colon].strip()
+                    headline_text = line[colon + 1:].strip()
+                    
+                    # Handle "SH:" in headline text
+                    if "SH:" in headline_text:
+                        parts = headline_text.split('SH:', 1)
+                        headline_text = f"{parts[0].strip()}: {parts[1].strip()}"
+                    
+                    headlines.append({
+                        'slug': identifier,
+                        'headline': headline_text,
+                        'category': current_category,
+                        'original': line
+                    })
+                    log.debug("Found headline: %s - %s", identifier, headline_text)
             else:
-                print(f"{YELLOW}Could not find Headlines section in document{ENDC}")
+                print(f"{C.YELLOW}Could not find Headlines section in document{C.ENDC}")
         
         print(f"Found {len(headlines)} potential headlines in document")
         return headlines
@@ -576,6 +738,55 @@ def parse_headlines_doc(doc_id):
         traceback.print_exc()
         return []
 
+def _parse_cutline_lines(lines, current_category="Uncategorized"):
+    """
+    Parse the lines of a cutlines section into cutline options.
+    "SECTION:" markers set the category of the lines that follow;
+    "[*]identifier: text [PHOTO CREDIT: credit]" lines become options and
+    anything else is ignored. This is the parser's inner loop, so the
+    regex methods are bound to locals once per call.
+    """
+    category_match = _CATEGORY_RE.fullmatch
+    cutline_match = _CUTLINE_RE.match
+    debug = log.isEnabledFor(logging.DEBUG)
+    cutlines = []
+
+    for line in lines:
+        # Category marker: the only colon is the last character
+        match = category_match(line)
+        if match:
+            current_category = match.group(1)
+            if debug:
+                log.debug("Found cutline category: %s", current_category)
+            continue
+
+        # Anything else needs a colon to be a cutline
+        match = cutline_match(line)
+        if not match:
+            continue
+
+        identifier = match.group('id').strip()
+        cutline_text = match.group('text').strip()
+        photo_credit = match.group('credit')
+        if photo_credit is not None:
+            photo_credit = photo_credit.strip()
+
+        if debug:
+            log.debug("Found cutline for %s: %s (credit: %s)",
+                      identifier, cutline_text, photo_credit or "none")
+
+        cutlines.append({
+            'slug': identifier,
+            'cutline': cutline_text,
+            'photo_credit': photo_credit,
+            'category': current_category,
+            # The line as written, minus a leading asterisk
+            'original': line[1:].strip() if line[:1] == '*' else line
+        })
+
+    return cutlines
+
+@_revision_cached
 def parse_cutlines_doc(doc_id):
     """
     Parse cutlines document and return a list of cutline options.
@@ -586,43 +797,12 @@ def parse_cutlines_doc(doc_id):
     """
     try:
         # Fetch the Google Doc content with ALL tabs
-        doc = docs_service.documents().get(
-            documentId=doc_id, 
-            includeTabsContent=True
-        ).execute()
+        doc = _fetch_doc(doc_id, include_tabs=True)
         
         # Check if we have tabs in the document
         if 'tabs' in doc and doc['tabs']:
-            print(f"Found {len(doc['tabs'])} tabs in the document")
-            
             # Extract all lines from each tab in the document
-            all_tabs_content = []
-            
-            for tab_idx, tab in enumerate(doc['tabs']):
-                tab_lines = []
-                print(f"Processing tab {tab_idx + 1}: {tab.get('title', 'Unnamed tab')}")
-                
-                # Skip tabs without document content
-                if 'documentTab' not in tab:
-                    continue
-                    
-                # Get content from this tab
-                tab_content = tab['documentTab'].get('body', {}).get('content', [])
-                
-                # Extract text from each paragraph in this tab
-                for element in tab_content:
-                    if 'paragraph' in element:
-                        elements = element['paragraph']['elements']
-                        text = ''.join([e.get('textRun', {}).get('content', '') for e in elements])
-                        if text.strip():  # Only append non-empty lines
-                            tab_lines.append(text.strip())
-                
-                if tab_lines:
-                    all_tabs_content.append({
-                        'tab_idx': tab_idx,
-                        'title': tab.get('title', f"Tab {tab_idx+1}"),
-                        'lines': tab_lines
-                    })
+            all_tabs_content = _doc_tabs(doc_id)
             
             # Look for the Cutlines tab/section in each tab
             cutlines = []
@@ -630,71 +810,13 @@ def parse_cutlines_doc(doc_id):
             
             for tab_content in all_tabs_content:
                 # Look for "Cutlines" marker or indicators
-                if any(line.lower() == "cutlines" for line in tab_content['lines']):
-                    print(f"Found Cutlines section in tab '{tab_content['title']}'")
+                if "cutlines" in tab_content['lowers']:
+                    log.debug("Found Cutlines section in tab '%s'", tab_content['title'])
                     cutlines_found = True
                     
-                    # Process lines in this tab
-                    current_category = "Uncategorized"
-                    
-                    for line in tab_content['lines']:
-                        # Skip the "Cutlines" marker line
-                        if line.lower() == "cutlines":
-                            continue
-                            
-                        # Check if this is a new section marker (ends with colon)
-                        if line.endswith(':') and not ':' in line[:-1]:  # Only category markers end with : and don't have : before
-                            current_category = line.rstrip(':')
-                            print(f"Found cutline category: {current_category}")
-                            continue
-                            
-                        # Skip empty lines
-                        if not line:
-                            continue
-                        
-                        # If line has a colon, it might be a cutline
-                        if ':' in line:
-                            # Remove leading asterisk if present
-                            if line.startswith('*'):
-                                line = line[1:].strip()
-                            
-                            # Split by first colon to get identifier and content
-                            parts = line.split(':', 1)
-                            if len(parts) == 2:
-                                identifier = parts[0].strip()
-                                cutline_text = parts[1].strip()
-                                
-                                # Extract photo credit if available
-                                photo_credit = None
-                                if "PHOTO CREDIT" in cutline_text:
-                                    credit_parts = cutline_text.split("PHOTO CREDIT", 1)
-                                    cutline_text = credit_parts[0].strip()
-                                    if len(credit_parts) > 1:
-                                        photo_credit = credit_parts[1].strip()
-                                        if photo_credit.startswith(':'):
-                                            photo_credit = photo_credit[1:].strip()
-                                
-                                # Also check for alternate "PHOTO CREDITS" format
-                                elif "PHOTO CREDITS" in cutline_text:
-                                    credit_parts = cutline_text.split("PHOTO CREDITS", 1)
-                                    cutline_text = credit_parts[0].strip()
-                                    if len(credit_parts) > 1:
-                                        photo_credit = credit_parts[1].strip()
-                                        if photo_credit.startswith(':'):
-                                            photo_credit = photo_credit[1:].strip()
-                                
-                                cutlines.append({
-                                    'slug': identifier,
-                                    'cutline': cutline_text,
-                                    'photo_credit': photo_credit,
-                                    'category': current_category,
-                                    'original': line
-                                })
-                                
-                                print(f"Found cutline for {identifier}:")
-                                print(f"  Text: {cutline_text}")
-                                if photo_credit:
-                                    print(f"  Credit: {photo_credit}")
+                    # Process lines in this tab; the "Cutlines" marker line
+                    # itself has no colon and is ignored by the parser
+                    cutlines = _parse_cutline_lines(tab_content['lines'])
                 
                 # If we found and processed cutlines in this tab, stop looking
                 if cutlines_found:
@@ -705,67 +827,11 @@ def parse_cutlines_doc(doc_id):
                 for tab_content in all_tabs_content:
                     for i, line in enumerate(tab_content['lines']):
                         if line == "NEWS:":
-                            print(f"Found NEWS: marker in tab '{tab_content['title']}', assuming this is part of Cutlines section")
-                            current_category = "NEWS"
+                            log.debug("Found NEWS: marker in tab '%s', assuming this is part of Cutlines section", tab_content['title'])
                             cutlines_found = True
                             
                             # Process subsequent lines as potential cutlines
-                            for j in range(i+1, len(tab_content['lines'])):
-                                line = tab_content['lines'][j]
-                                
-                                # If this is a new section marker
-                                if line.endswith(':') and not ':' in line[:-1]:
-                                    current_category = line.rstrip(':')
-                                    print(f"Found cutline category: {current_category}")
-                                    continue
-                                    
-                                # Skip empty lines
-                                if not line:
-                                    continue
-                                
-                                # If line has a colon, it might be a cutline
-                                if ':' in line:
-                                    # Remove leading asterisk if present
-                                    if line.startswith('*'):
-                                        line = line[1:].strip()
-                                    
-                                    # Split by first colon to get identifier and content
-                                    parts = line.split(':', 1)
-                                    if len(parts) == 2:
-                                        identifier = parts[0].strip()
-                                        cutline_text = parts[1].strip()
-                                        
-                                        # Extract photo credit if available
-                                        photo_credit = None
-                                        if "PHOTO CREDIT" in cutline_text:
-                                            credit_parts = cutline_text.split("PHOTO CREDIT", 1)
-                                            cutline_text = credit_parts[0].strip()
-                                            if len(credit_parts) > 1:
-                                                photo_credit = credit_parts[1].strip()
-                                                if photo_credit.startswith(':'):
-                                                    photo_credit = photo_credit[1:].strip()
-                                        
-                                        # Also check for alternate "PHOTO CREDITS" format
-                                        elif "PHOTO CREDITS" in cutline_text:
-                                            credit_parts = cutline_text.split("PHOTO CREDITS", 1)
-                                            cutline_text = credit_parts[0].strip()
-                                            if len(credit_parts) > 1:
-                                                photo_credit = credit_parts[1].strip()
-                                                if photo_credit.startswith(':'):
-                                                    photo_credit = photo_credit[1:].strip()
-                                        
-                                        cutlines.append({
-                                            'slug': identifier,
-                                            'cutline': cutline_text,
-                                            'photo_credit': photo_credit,
-                                            'category': current_category,
-                                            'original': line
-                                        })
-                                        
-                                        print(f"Found cutline for {identifier}:")
-                                        print(f"  Text: {cutline_text}")
-                                        if photo_credit:
-                                            print(f"  Credit: {photo_credit}")
+                            cutlines = _parse_cutline_lines(tab_content['lines'][i+1:], "NEWS")
                             
                             break
                     
@@ -773,95 +839,26 @@ def parse_cutlines_doc(doc_id):
                         break
             
             if not cutlines_found:
-                print(f"{YELLOW}Could not find Cutlines section in any tab{ENDC}")
+                print(f"{C.YELLOW}Could not find Cutlines section in any tab{C.ENDC}")
                 return []
         else:
             # Fallback to the old method (document without tabs)
-            print("Document doesn't have tabs. Falling back to single document parser.")
-            content = doc['body']['content']
-            
-            all_lines = []
-            
-            for element in content:
-                if 'paragraph' in element:
-                    elements = element['paragraph']['elements']
-                    text = ''.join([e.get('textRun', {}).get('content', '') for e in elements])
-                    if text.strip():  # Only append non-empty lines
-                        all_lines.append(text.strip())
-            
-            # Look for the "Cutlines" section anywhere in the document
-            cutlines_start = None
-            for i, line in enumerate(all_lines):
+            log.debug("Document doesn't have tabs. Falling back to single document parser.")
+            # Single pass over the document: skip ahead to the "Cutlines"
+            # marker, then parse every following line
+            cutlines = []
+            in_cutlines = False
+            lines = _iter_doc_lines(doc['body']['content'])
+
+            for line_num, line in enumerate(lines, 1):
                 if line.lower() == "cutlines":
-                    cutlines_start = i + 1
-                    print(f"Found Cutlines section at line {cutlines_start}")
-                    break
-                elif line == "NEWS:" and i > 0 and all_lines[i-1].lower() == "cutlines":
-                    cutlines_start = i
-                    print(f"Found NEWS: marker after Cutlines at line {cutlines_start}")
+                    in_cutlines = True
+                    log.debug("Found Cutlines section at line %d", line_num)
+                    cutlines = _parse_cutline_lines(lines)
                     break
-            
-            # Process cutlines if section found
-            cutlines = []
-            if cutlines_start is not None:
-                current_category = "Uncategorized"
-                
-                for line in all_lines[cutlines_start:]:
-                    # Check if this is a new section marker
-                    if line.endswith(':') and not ':' in line[:-1]:
-                        current_category = line.rstrip(':')
-                        print(f"Found cutline category: {current_category}")
-                        continue
-                        
-                    # Skip empty lines
-                    if not line:
-                        continue
-                    
-                    # If line has a colon, it might be a cutline
-                    if ':' in line:
-                        # Remove leading asterisk if present
-                        if line.startswith('*'):
-                            line = line[1:].strip()
-                        
-                        # Split by first colon to get identifier and content
-                        parts = line.split(':', 1)
-                        if len(parts) == 2:
-                            identifier = parts[0].strip()
-                            cutline_text = parts[1].strip()
-                            
-                            # Extract photo credit if available
-                            photo_credit = None
-                            if "PHOTO CREDIT" in cutline_text:
-                                credit_parts = cutline_text.split("PHOTO CREDIT", 1)
-                                cutline_text = credit_parts[0].strip()
-                                if len(credit_parts) > 1:
-                                    photo_credit = credit_parts[1].strip()
-                                    if photo_credit.startswith(':'):
-                                        photo_credit = photo_credit[1:].strip()
-                            
-                            # Also check for alternate "PHOTO CREDITS" format
-                            elif "PHOTO CREDITS" in cutline_text:
-                                credit_parts = cutline_text.split("PHOTO CREDITS", 1)
-                                cutline_text = credit_parts[0].strip()
-                                if len(credit_parts) > 1:
-                                    photo_credit = credit_parts[1].strip()
-                                    if photo_credit.startswith(':'):
-                                        photo_credit = photo_credit[1:].strip()
-                            
-                            cutlines.append({
-                                'slug': identifier,
-                                'cutline': cutline_text,
-                                'photo_credit': photo_credit,
-                                'category': current_category,
-                                'original': line
-                            })
-                            
-                            print(f"Found cutline for {identifier}:")
-                            print(f"  Text: {cutline_text}")
-                            if photo_credit:
-                                print(f"  Credit: {photo_credit}")
-            else:
-                print(f"{YELLOW}Could not find Cutlines section in document{ENDC}")
+
+            if not in_cutlines:
+                print(f"{C.YELLOW}Could not find Cutlines section in document{C.ENDC}")
         
         print(f"Found {len(cutlines)} potential cutlines in document")
         return cutlines
@@ -872,8 +869,16 @@ def parse_cutlines_doc(doc_id):
         traceback.print_exc()
         return []
 
-def update_online_status(sheet_id, cell_reference):
-    """Update the 'Online' checkbox in the Google Sheet to checked."""
+def update_online_statuses(sheet_id, cell_references):
+    """
+    Check the 'Online' checkbox for several rows in a single batchUpdate
+    request, so publishing many posts costs one write against the Sheets
+    quota instead of one per post. The update is applied atomically;
+    returns a dict of cell reference -> True/False.
+    """
+    cell_references = list(dict.fromkeys(cell_references))
+    if not cell_references:
+        return {}
     try:
         # For checkboxes, we need to use batchUpdate with cell format
         batch_update_body = {
@@ -895,25 +900,25 @@ def update_online_status(sheet_id, cell_reference):
                     }],
                     'fields': 'userEnteredValue'
                 }
-            }]
+            } for cell_reference in cell_references]
         }
 
         # Execute the update
-        result = sheets_service.spreadsheets().batchUpdate(
+        get_sheets_service().spreadsheets().batchUpdate(
             spreadsheetId=sheet_id,
             body=batch_update_body
         ).execute()
 
-        print(f"Updated checkbox in cell {cell_reference}")
-        return True
+        print(f"Updated checkbox in cells {', '.join(cell_references)}")
+        return dict.fromkeys(cell_references, True)
 
     except Exception as e:
-        print(f"Failed to update spreadsheet checkbox: {e}")
-        return False
+        print(f"Failed to update spreadsheet checkboxes: {e}")
+        return dict.fromkeys(cell_references, False)
     
 def get_sheet_id(sheet_url):
     """Extract the sheet ID from a Google Sheets URL."""
-    match = re.search(r"/d/([a-zA-Z0-9_-]+)", sheet_url)
+    match = _SHEET_ID_RE.search(sheet_url)
     if match:
         return match.group(1)
     else:
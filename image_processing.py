@@ -3,62 +3,184 @@ import os
 import io
 import mimetypes
 import time
+import uuid
+import threading
 import requests
-from base64 import b64encode
-from datetime import datetime
-from googleapiclient.http import MediaIoBaseDownload
-from googleapiclient.errors import HttpError
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 from constants import (
-    drive_service, WP_URL, WP_USER, WP_PASSWORD,
-    GREEN, YELLOW, RED, BLUE, BOLD, ENDC
+    get_drive_service, get_authorized_session, execute_batch, DRIVE_SCOPES, CONFIG, C
 )
+from wordpress_integration import WP_SESSION
+
+# Drive file ID patterns, tried in order: file/d/ and open?id= formats
+_FILE_ID_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'/file/d/([a-zA-Z0-9_-]+)',
+    r'id=([a-zA-Z0-9_-]+)',
+    r'/open\?id=([a-zA-Z0-9_-]+)'
+))
+
+DRIVE_FILES_URL = 'https://www.googleapis.com/drive/v3/files/'
+DRIVE_METADATA_FIELDS = "name,mimeType"
+
+# Image downloads and uploads are network-bound, so a few threads overlap
+# them without contending for the GIL
+IMAGE_IO_WORKERS = 6
+_IMAGE_IO_POOL = ThreadPoolExecutor(max_workers=IMAGE_IO_WORKERS, thread_name_prefix='image-io')
+
+# Downloads started by download_image_async, by file ID
+_pending_downloads = {}
+
+# Output of process_image_from_url_async's worker, held back per thread so
+# it does not interleave with what the main thread prints meanwhile
+_output = threading.local()
+
+def _print(*args, **kwargs):
+    """print(), into the current thread's held-back output if it has one."""
+    print(*args, file=getattr(_output, 'buffer', None), **kwargs)
+
+# Media uploads go through the shared WordPress session; retries of the
+# POST itself are handled by upload_image_to_wordpress
+_WP_MEDIA_URL = f'{CONFIG.wp_url}/wp/v2/media'
+
+# Image formats WordPress accepts, by MIME type and by file extension
+_WP_MIME_TO_EXT = {
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/heic': '.heic',
+    'image/heif': '.heif'
+}
+_WP_EXT_SET = frozenset(('.png', '.jpg', '.jpeg', '.gif', '.webp', '.heic', '.heif'))
+
+# Drive metadata by file ID, memoized so an image shared by several posts is
+# only looked up once per run; filled on first lookup or by prefetch_metadata
+_drive_metadata = {}
+
+# Image bodies kept for reuse by a later post sharing the same file; kept
+# small, since every entry holds a whole image in memory for the run
+IMAGE_CACHE_SIZE = 4
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def _download_image_bytes(file_id):
+    """
+    Download a Drive file's contents as bytes; raises on failure.
+    One plain GET on a shared keep-alive session, rather than the discovery
+    client's chunked MediaIoBaseDownload. When the size is known up front
+    the body is read in one call instead of being joined from chunks.
+    """
+    with get_authorized_session(DRIVE_SCOPES).get(
+        DRIVE_FILES_URL + file_id,
+        params={'alt': 'media'},
+        stream=True,
+        timeout=60
+    ) as response:
+        response.raise_for_status()
+        length = response.headers.get('Content-Length')
+        if length is None or 'Content-Encoding' in response.headers:
+            return response.content
+        data = response.raw.read(int(length))
+        if len(data) != int(length):
+            raise requests.ConnectionError(
+                f"Download of {file_id} ended after {len(data)} of {length} bytes"
+            )
+        return data
+
+def get_drive_metadata(file_id):
+    """Return {'name', 'mimeType'} for a Drive file."""
+    if file_id in _drive_metadata:
+        return _drive_metadata[file_id]
+    response = get_authorized_session(DRIVE_SCOPES).get(
+        DRIVE_FILES_URL + file_id,
+        params={'fields': DRIVE_METADATA_FIELDS},
+        timeout=10
+    )
+    response.raise_for_status()
+    metadata = _drive_metadata[file_id] = response.json()
+    return metadata
+
+def prefetch_metadata(file_ids):
+    """
+    Fetch metadata for many Drive files in batched requests instead of one
+    round trip per image. Returns a dict of file ID -> metadata; files that
+    fail are left out and looked up again individually when processed.
+    """
+    file_ids = [file_id for file_id in dict.fromkeys(file_ids) if file_id]
+    missing = [file_id for file_id in file_ids if file_id not in _drive_metadata]
+    if missing:
+        try:
+            files = get_drive_service().files()
+            results = execute_batch(get_drive_service(), {
+                file_id: files.get(fileId=file_id, fields=DRIVE_METADATA_FIELDS)
+                for file_id in missing
+            })
+        except Exception as e:
+            print(f"{C.YELLOW}Could not prefetch image metadata: {e}{C.ENDC}")
+            results = {}
+        for file_id, result in results.items():
+            if isinstance(result, Exception):
+                print(f"{C.YELLOW}Could not prefetch metadata for {file_id}: {result}{C.ENDC}")
+            else:
+                _drive_metadata[file_id] = result
+
+    return {file_id: _drive_metadata[file_id] for file_id in file_ids if file_id in _drive_metadata}
 
 def download_image(file_id):
-    """Download image from Google Drive."""
+    """
+    Download image from Google Drive, waiting on a background download if one
+    was started; returns None on failure. A background download's error is
+    reported here, by the thread that uses the image.
+    """
+    future = _pending_downloads.pop(file_id, None)
     try:
-        request = drive_service.files().get_media(fileId=file_id)
-        fh = io.BytesIO()
-        downloader = MediaIoBaseDownload(fh, request)
-        done = False
-        while not done:
-            _, done = downloader.next_chunk()
-        return fh.getvalue()
-    except HttpError as error:
-        print(f"Image download failed: {error}")
+        if future is not None:
+            return future.result()
+        return _download_image_bytes(file_id)
+    except requests.RequestException as error:
+        _print(f"Image download failed: {error}")
         return None
+
+def download_image_async(file_id):
+    """Start downloading a Drive image in the background; returns a Future of the bytes, which download_image collects."""
+    future = _pending_downloads.get(file_id)
+    if future is None:
+        future = _pending_downloads[file_id] = _IMAGE_IO_POOL.submit(_download_image_bytes, file_id)
+    return future
+
+def cancel_image_io():
+    """Cancel queued image transfers, so exiting after an ESC does not wait for them."""
+    _IMAGE_IO_POOL.shutdown(wait=False, cancel_futures=True)
+
+def discard_image_download(file_id):
+    """Drop a background download nobody is going to use, cancelling it if it has not started."""
+    future = _pending_downloads.pop(file_id, None)
+    if future is not None:
+        future.cancel()
     
 def process_image_from_url(image_url, caption, doc_id):
     """Process image from a Google Drive URL."""
     if not image_url:
         return None
         
-    # Define WordPress supported image formats
-    SUPPORTED_FORMATS = {
-        'image/png': '.png',
-        'image/jpeg': '.jpg',
-        'image/jpg': '.jpg',
-        'image/gif': '.gif',
-        'image/webp': '.webp',
-        'image/heic': '.heic',
-        'image/heif': '.heif'
-    }
-        
     file_id = extract_file_id(image_url)
     if not file_id:
-        print(f"Failed to extract file ID from URL: {image_url}")
+        _print(f"Failed to extract file ID from URL: {image_url}")
         return None
         
-    print(f"Downloading image with file ID: {file_id}")
+    _print(f"Downloading image with file ID: {file_id}")
     
     # Get file metadata first to determine the file type
     try:
-        file_metadata = drive_service.files().get(fileId=file_id, fields="name,mimeType").execute()
+        file_metadata = get_drive_metadata(file_id)
         file_name = file_metadata.get('name', f"image_{doc_id}")
         file_mime_type = file_metadata.get('mimeType', '')
         
-        print(f"File name from Drive: {file_name}")
-        print(f"File MIME type from Drive: {file_mime_type}")
+        _print(f"File name from Drive: {file_name}")
+        _print(f"File MIME type from Drive: {file_mime_type}")
         
         # Determine file extension from mime type or original filename
         file_ext = None
@@ -67,38 +189,37 @@ def process_image_from_url(image_url, caption, doc_id):
         if '.' in file_name:
             original_ext = os.path.splitext(file_name)[1].lower()  # Get extension including the dot
             # Check if this is a supported extension
-            for mime, ext in SUPPORTED_FORMATS.items():
-                if original_ext == ext or original_ext == '.jpeg' and ext == '.jpg':
-                    file_ext = original_ext
-                    break
+            if original_ext in _WP_EXT_SET:
+                file_ext = original_ext
         
         # If extension not determined from filename, try from mime type
-        if not file_ext and file_mime_type in SUPPORTED_FORMATS:
-            file_ext = SUPPORTED_FORMATS[file_mime_type]
-            print(f"Using extension {file_ext} based on MIME type")
+        if not file_ext:
+            file_ext = _WP_MIME_TO_EXT.get(file_mime_type)
+            if file_ext:
+                _print(f"Using extension {file_ext} based on MIME type")
         
         # If we still don't have a supported extension, we need to use fallback options
         if not file_ext:
-            print(f"Unsupported image format detected: {file_mime_type}")
-            print(f"Original filename: {file_name}")
-            print("WordPress only supports: PNG, JPG/JPEG, GIF, WebP, HEIC, and HEIF")
+            _print(f"Unsupported image format detected: {file_mime_type}")
+            _print(f"Original filename: {file_name}")
+            _print("WordPress only supports: PNG, JPG/JPEG, GIF, WebP, HEIC, and HEIF")
             return None  # This will trigger the fallback in the main function
             
-        print(f"Using file extension: {file_ext}")
+        _print(f"Using file extension: {file_ext}")
         
     except Exception as e:
-        print(f"Warning: Could not determine image format: {str(e)}")
-        print("Cannot verify if image format is supported. Trying fallback options...")
+        _print(f"Warning: Could not determine image format: {str(e)}")
+        _print("Cannot verify if image format is supported. Trying fallback options...")
         return None  # Trigger fallback
     
     # Download the file
     image_data = download_image(file_id)
     if not image_data:
-        print(f"Failed to download image data from file ID: {file_id}")
+        _print(f"Failed to download image data from file ID: {file_id}")
         return None
         
     filename = f"featured_image_{doc_id}{file_ext}"
-    print(f"Uploading image: {filename}")
+    _print(f"Uploading image: {filename}")
     
     # Use improved upload function with retries
     return upload_image_to_wordpress(
@@ -109,45 +230,54 @@ def process_image_from_url(image_url, caption, doc_id):
         retry_delay=2
     )
 
+def _process_image_held(image_url, caption, doc_id):
+    _output.buffer = buffer = io.StringIO()
+    try:
+        return process_image_from_url(image_url, caption, doc_id), buffer.getvalue()
+    finally:
+        _output.buffer = None
+
+def process_image_from_url_async(image_url, caption, doc_id):
+    """
+    Run process_image_from_url in the background. Returns a Future of
+    (media ID or None, printed output); the caller prints the output once it
+    has the result, so it does not interleave with the caller's own.
+    """
+    return _IMAGE_IO_POOL.submit(_process_image_held, image_url, caption, doc_id)
+
 def handle_image_fallback(caption, doc_id):
     """Handle image upload fallback when the initial upload fails."""
-    # Define WordPress supported image formats
-    SUPPORTED_FORMATS = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.heic', '.heif']
-    
-    print(f"\n{YELLOW}{BOLD}Image upload fallback options:{ENDC}")
+    print(f"\n{C.YELLOW}{C.BOLD}Image upload fallback options:{C.ENDC}")
     print("1. Enter a new Google Drive URL")
     print("2. Provide a local file path")
     print("3. Skip image upload (continue without image)")
     
-    choice = input(f"\n{BLUE}Select an option (1-3): {ENDC}").strip()
+    choice = input(f"\n{C.BLUE}Select an option (1-3): {C.ENDC}").strip()
     
     if choice == '1':
         # Option 1: New Google Drive URL
-        new_url = input(f"{BLUE}Enter new Google Drive URL: {ENDC}").strip()
+        new_url = input(f"{C.BLUE}Enter new Google Drive URL: {C.ENDC}").strip()
         if new_url:
             return process_image_from_url(new_url, caption, doc_id)
         else:
-            print(f"{RED}No URL provided. Skipping image upload.{ENDC}")
+            print(f"{C.RED}No URL provided. Skipping image upload.{C.ENDC}")
             return None
             
     elif choice == '2':
         # Option 2: Local file path
-        local_path = input(f"{BLUE}Enter local file path: {ENDC}").strip()
+        local_path = input(f"{C.BLUE}Enter local file path: {C.ENDC}").strip()
         if os.path.exists(local_path):
             try:
                 # Check file extension first
                 file_ext = os.path.splitext(local_path)[1].lower()
-                if file_ext not in SUPPORTED_FORMATS:
-                    print(f"{RED}Unsupported file format: {file_ext}{ENDC}")
-                    print(f"{YELLOW}WordPress only supports: {', '.join(SUPPORTED_FORMATS)}{ENDC}")
-                    print(f"{YELLOW}Please select a different file.{ENDC}")
+                if file_ext not in _WP_EXT_SET:
+                    print(f"{C.RED}Unsupported file format: {file_ext}{C.ENDC}")
+                    print(f"{C.YELLOW}WordPress only supports: {', '.join(sorted(_WP_EXT_SET))}{C.ENDC}")
+                    print(f"{C.YELLOW}Please select a different file.{C.ENDC}")
                     # Recursive call to try again
                     return handle_image_fallback(caption, doc_id)
                 
                 # If we get here, the file format is supported
-                with open(local_path, 'rb') as file:
-                    image_data = file.read()
-                
                 # Preserve the original filename with extension
                 original_filename = os.path.basename(local_path)
                 filename = f"featured_image_{doc_id}_{original_filename}"
@@ -157,100 +287,98 @@ def handle_image_fallback(caption, doc_id):
                 mime_type = mimetypes.guess_type(local_path)[0] or 'image/jpeg'
                 print(f"Detected mime type: {mime_type}")
                 
-                return upload_image_to_wordpress(
-                    image_data,
-                    caption,
-                    filename,
-                    max_retries=3,
-                    retry_delay=3
-                )
+                # Upload straight from the open file
+                with open(local_path, 'rb') as image_file:
+                    return upload_image_to_wordpress(
+                        image_file,
+                        caption,
+                        filename,
+                        max_retries=3,
+                        retry_delay=3
+                    )
             except Exception as e:
-                print(f"{RED}Error reading local file: {str(e)}{ENDC}")
+                print(f"{C.RED}Error reading local file: {str(e)}{C.ENDC}")
                 # Recursive call to try again
                 return handle_image_fallback(caption, doc_id)
         else:
-            print(f"{RED}File not found: {local_path}{ENDC}")
+            print(f"{C.RED}File not found: {local_path}{C.ENDC}")
             # Recursive call to try again
             return handle_image_fallback(caption, doc_id)
     
     else:
         # Option 3 or invalid input: Skip image upload
-        print(f"{YELLOW}Skipping image upload.{ENDC}")
+        print(f"{C.YELLOW}Skipping image upload.{C.ENDC}")
         return None
 
 def extract_file_id(url):
     """Extract Google Drive file ID from URL."""
-    # Support both file/d/ and open?id= formats
-    file_patterns = [
-        r'/file/d/([a-zA-Z0-9_-]+)',
-        r'id=([a-zA-Z0-9_-]+)',
-        r'/open\?id=([a-zA-Z0-9_-]+)'
-    ]
-
-    for pattern in file_patterns:
-        match = re.search(pattern, url)
+    for pattern in _FILE_ID_PATTERNS:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     return None
 
 def upload_image_to_wordpress(image_data, caption, filename, max_retries=3, retry_delay=3):
-    """Upload image to WordPress media library with retry logic and improved error handling."""
+    """
+    Upload image to WordPress media library with retry logic and improved error handling.
+    image_data may be bytes or a binary file object.
+    """
     if not image_data:
-        print("No image data provided")
+        _print("No image data provided")
         return None
 
     mime_type = mimetypes.guess_type(filename)[0] or 'image/jpeg'
 
-    for attempt in range(1, max_retries + 1):
-        try:
-            # Ensure unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{timestamp}_{filename}"
-
-            headers = {
-                'Authorization': f'Basic {b64encode(f"{WP_USER}:{WP_PASSWORD}".encode()).decode()}'
-            }
+    # The body is streamed from a file object rather than copied into one
+    # bytes blob; bytes are wrapped without copying
+    if isinstance(image_data, (bytes, bytearray)):
+        image_data = io.BytesIO(image_data)
 
-            files = {
-                'file': (filename, image_data, mime_type),
-            }
+    # Ensure unique filename (once, so retries don't stack prefixes); a
+    # random prefix stays unique for uploads started in the same second
+    filename = f"{uuid.uuid4().hex[:12]}_{filename}"
+    file_field = (filename, image_data, mime_type)
 
-            data = {
+    for attempt in range(1, max_retries + 1):
+        try:
+            # A retry re-reads the image from the start
+            image_data.seek(0)
+            body = MultipartEncoder(fields={
+                'file': file_field,
                 'title': filename,
                 'caption': caption,
                 'alt_text': caption
-            }
+            })
 
-            print(f"Attempt {attempt}/{max_retries}: Uploading image '{filename}'")
+            _print(f"Attempt {attempt}/{max_retries}: Uploading image '{filename}'")
             
-            response = requests.post(
-                f'{WP_URL}/wp/v2/media',
-                headers=headers,
-                files=files,
-                data=data,
+            response = WP_SESSION.post(
+                _WP_MEDIA_URL,
+                headers={'Content-Type': body.content_type},
+                data=body,
                 timeout=30
             )
 
             if response.status_code == 201:
                 media_data = response.json()
-                print(f"Successfully uploaded image: {media_data.get('source_url')}")
+                _print(f"Successfully uploaded image: {media_data.get('source_url')}")
                 return media_data.get('id')
             else:
-                print(f"Image upload failed with status {response.status_code}: {response.text}")
+                _print(f"Image upload failed with status {response.status_code}: {response.text}")
                 if attempt < max_retries:
-                    print(f"Waiting {retry_delay} seconds before retrying...")
+                    _print(f"Waiting {retry_delay} seconds before retrying...")
                     time.sleep(retry_delay)
                 else:
-                    print(f"Maximum retry attempts reached. Image upload failed.")
+                    _print(f"Maximum retry attempts reached. Image upload failed.")
                     return None
 
         except Exception as e:
-            print(f"Image upload failed: {str(e)}")
+            _print(f"Image upload failed: {str(e)}")
             if attempt < max_retries:
-                print(f"Waiting {retry_delay} seconds before retrying...")
+                _print(f"Waiting {retry_delay} seconds before retrying...")
                 time.sleep(retry_delay)
             else:
-                print(f"Maximum retry attempts reached. Image upload failed.")
+                _print(f"Maximum retry attempts reached. Image upload failed.")
                 return None
     
     return None
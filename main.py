@@ -1,121 +1,416 @@
-import re
+import io
 import os
-import time
-from constants import (
-    GOOGLE_CREDENTIALS_FILE, WP_URL, WP_USER, WP_PASSWORD,
-    GREEN, YELLOW, RED, BLUE, BOLD, ORANGE, ENDC
-)
+import re
+import sys
+import json
+import queue
+import atexit
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from collections import defaultdict
+from itertools import islice
+from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from enum import IntEnum
+from typing import Optional
+from constants import C
 
 # Import functions from our modules
 from google_integration import (
     get_eligible_rows, parse_redaction_doc, parse_headlines_doc,
-    parse_cutlines_doc, get_sheet_id, update_online_status, get_single_key
+    parse_cutlines_doc, get_sheet_id, update_online_statuses, get_single_key,
+    fetch_docs_async, cancel_doc_fetches
 )
 from wordpress_integration import (
-    get_or_create_author_id, get_category_ids, create_wordpress_post_with_details
+    get_or_create_author_id, get_category_ids, create_wordpress_post_with_details,
+    prefetch_author_ids, get_wordpress_categories
 )
 from image_processing import (
-    process_image_from_url, handle_image_fallback
+    process_image_from_url_async, handle_image_fallback, prefetch_metadata, extract_file_id,
+    download_image_async, discard_image_download, cancel_image_io
 )
 from user_interface import (
     select_headline_interactively, select_cutline_interactively,
-    display_post_details
+    display_post_details, group_by_category
 )
 
+_DOC_ID_RE = re.compile(r'[A-Za-z0-9_-]+')
+
+def extract_doc_id(url):
+    """Return the Google Doc ID in a docs.google.com/document/d/<id>/... URL, or None."""
+    _, marker, doc_id = url.partition('/document/d/')
+    if not marker:
+        return None
+    # The ID is the run of ID characters after the marker; this also drops
+    # the path, query string or fragment and any trailing punctuation
+    match = _DOC_ID_RE.match(doc_id)
+    return match.group() if match else None
+
+# Per-run JSON Lines logs of every processed row
+RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'runs')
+
+class ImageSource(IntEnum):
+    """Where a post's featured image was uploaded from."""
+    NONE = 0
+    SPREADSHEET = 1
+    FALLBACK = 2
+    MANUAL = 3
+
+# Image bytes are downloaded this many posts ahead of the one being
+# reviewed, rather than all at startup, so they are not all held in memory
+IMAGE_PREFETCH_AHEAD = 3
+
+# Shown in the post review screen
+IMAGE_SOURCE_LABELS = {
+    ImageSource.NONE: "None",
+    ImageSource.SPREADSHEET: "Column N from spreadsheet",
+    ImageSource.FALLBACK: "Alternative URL (fallback)",
+    ImageSource.MANUAL: "Manual input (local file)",
+}
+
+# Shown in the summary
+_IMAGE_UPLOAD_STATUS = {
+    ImageSource.SPREADSHEET: "Uploaded successfully from spreadsheet URL",
+    ImageSource.FALLBACK: "Uploaded successfully via fallback method",
+    ImageSource.MANUAL: "Uploaded successfully via manual input",
+}
+
+@dataclass(slots=True)
+class ImageStatus:
+    """Featured image outcome for one post; the summary text is built by describe()."""
+    source: ImageSource = ImageSource.NONE
+    media_id: Optional[int] = None
+    verified: Optional[bool] = None  # None until the created post has been checked
+    reason: str = 'No image found'  # Why there is no image, when source is NONE
+
+    @property
+    def has_image(self):
+        return self.source != ImageSource.NONE
+
+    def describe(self):
+        status = _IMAGE_UPLOAD_STATUS.get(self.source, self.reason)
+        if self.verified is True:
+            status += ' and verified'
+        elif self.verified is False:
+            status += ' but verification failed'
+        return status
+
+@dataclass(slots=True)
+class AuthorStatus:
+    requested: int = 0
+    applied: int = 0
+    primary_author_id: Optional[int] = None
+    status: str = 'Not processed'
+
+@dataclass(slots=True)
+class CategoryStatus:
+    requested: int = 0
+    applied: int = 0
+    status: str = 'Not processed'
+
+@dataclass(slots=True)
+class PostInfo:
+    """Everything reported about one row in the end-of-run summary."""
+    row: int
+    section: str
+    authors: list
+    categories: list
+    photographer: Optional[str] = None
+    headline: str = 'Unknown'
+
+    # Status tracking fields
+    status: str = 'Skipped'  # Published, Draft, Skipped or Failed
+    post_url: Optional[str] = None
+    post_id: Optional[int] = None
+    image_status: ImageStatus = field(default_factory=ImageStatus)
+    category_status: CategoryStatus = field(default_factory=CategoryStatus)
+    author_status: AuthorStatus = field(default_factory=AuthorStatus)
+    sheet_update_status: str = 'Not updated'
+    error_details: Optional[str] = None
+
+def open_run_log():
+    """Open a new JSON Lines run log under RUNS_DIR; None if it cannot be created."""
+    try:
+        os.makedirs(RUNS_DIR, exist_ok=True)
+        path = os.path.join(RUNS_DIR, f"run-{datetime.now():%Y%m%d-%H%M%S}.jsonl")
+        return open(path, 'a', encoding='utf-8')
+    except OSError as e:
+        print(f"{C.YELLOW}Could not create run log: {e}{C.ENDC}")
+        return None
+
+def record_post(run_log, post_info):
+    """
+    Append a row's outcome to the run log. A row may be written more than
+    once (e.g. after its spreadsheet update); the last line for a row wins.
+    """
+    if run_log:
+        run_log.write(json.dumps(asdict(post_info), ensure_ascii=False) + '\n')
+        run_log.flush()
+
+def flush_online_updates(sheet_id, pending_updates, run_log=None):
+    """
+    Tick the 'Online' checkbox for the queued (cell, post_info) pairs in one
+    Sheets request and record the outcome on each post.
+    """
+    if not pending_updates:
+        return
+    print(f"{C.BLUE}Updating spreadsheet for {len(pending_updates)} published post(s)...{C.ENDC}")
+    results = update_online_statuses(sheet_id, [cell for cell, _ in pending_updates])
+    for cell, post_info in pending_updates:
+        post_info.sheet_update_status = 'Updated successfully' if results.get(cell) else 'Update failed'
+        record_post(run_log, post_info)
+    pending_updates.clear()
+
+def release_row_image(row):
+    """Drop a row's prefetched image if it was never uploaded (e.g. the row failed first)."""
+    if row.get('image_url'):
+        discard_image_download(extract_file_id(row['image_url']))
+
+def apply_post_response(post_info, post_response, status):
+    """Record a successfully created post and its verification results in post_info."""
+    post_info.status = status
+    post_info.post_id = post_response['post_id']
+    post_info.post_url = post_response['post_url']
+    
+    # Update verification statuses
+    if 'featured_media_verified' in post_response and post_info.image_status.has_image:
+        post_info.image_status.verified = bool(post_response['featured_media_verified'])
+    
+    if 'categories_verified' in post_response:
+        if post_response['categories_verified']:
+            post_info.category_status.status += ' and verified'
+        else:
+            post_info.category_status.status += ' but verification failed'
+
+def print_summary(successful_posts, skipped_posts, failed_posts):
+    """Print the end-of-run summary, grouped by section, followed by the overall totals."""
+    print(f"\n{C.BOLD}{C.BLUE}" + "="*70)
+    print("POSTING SUMMARY BY SECTION")
+    print("="*70 + f"{C.ENDC}")
+
+    # Group the posts by section in one pass, counting published/draft posts
+    by_section = defaultdict(lambda: {'ok': [], 'skip': [], 'fail': [], 'Published': 0, 'Draft': 0})
+    for post in successful_posts:
+        bucket = by_section[post.section]
+        bucket['ok'].append(post)
+        bucket[post.status] += 1
+    for post in skipped_posts:
+        by_section[post.section]['skip'].append(post)
+    for post in failed_posts:
+        by_section[post.section]['fail'].append(post)
+    
+    # Create summary for each section
+    for section in sorted(by_section):
+        bucket = by_section[section]
+        print(f"\n{C.BOLD}{C.BLUE}📌 SECTION: {section}{C.ENDC}")
+        print("-"*70)
+        
+        # Successful posts for this section
+        section_successful = bucket['ok']
+        if section_successful:
+            print(f"\n{C.GREEN}{C.BOLD}✅ POSTS CREATED SUCCESSFULLY{C.ENDC}")
+            print("-"*50)
+            for post in section_successful:
+                print(f"\n{C.BOLD}Row {post.row}: {post.headline} ({post.status}){C.ENDC}")
+                print(f"🔗 Post URL: {post.post_url}")
+                
+                # Author information
+                if len(post.authors) > 1:
+                    print(f"✍️  {C.BOLD}Authors:{C.ENDC}")
+                    print(f"   Primary author: {post.authors[0]} (ID: {post.author_status.primary_author_id})")
+                    print(f"   Co-authors to add manually: {', '.join(post.authors[1:])}")
+                else:
+                    print(f"✍️  {C.BOLD}Author:{C.ENDC} {post.authors[0] if post.authors else 'No author specified'}")
+                print(f"    Status: {post.author_status.status}")
+                
+                # Category information
+                print(f"🏷️  {C.BOLD}Categories:{C.ENDC}")
+                print(f"    Requested ({post.category_status.requested}): {', '.join(post.categories)}")
+                print(f"    Status: {post.category_status.status}")
+                
+                # Image information
+                print(f"🖼️  {C.BOLD}Featured Image:{C.ENDC}")
+                print(f"    Status: {post.image_status.describe()}")
+                if post.photographer:
+                    print(f"    Photographer: {post.photographer}")
+                    
+                # Spreadsheet update status
+                print(f"📊 {C.BOLD}Spreadsheet:{C.ENDC} {post.sheet_update_status}")
+        
+        # Skipped posts for this section
+        section_skipped = bucket['skip']
+        if section_skipped:
+            print(f"\n{C.BLUE}{C.BOLD}⏭️ SKIPPED POSTS{C.ENDC}")
+            print("-"*50)
+            for post in section_skipped:
+                print(f"Row {post.row}: {post.headline}")
+        
+        # Failed posts for this section
+        section_failed = bucket['fail']
+        if section_failed:
+            print(f"\n{C.RED}{C.BOLD}❌ POSTS WITH ERRORS{C.ENDC}")
+            print("-"*50)
+            for post in section_failed:
+                print(f"\n{C.BOLD}Row {post.row}: {post.headline}{C.ENDC}")
+                
+                # Error details
+                print(f"{C.RED}Error: {post.error_details}{C.ENDC}")
+                
+                # Display any progress that was made before failure
+                if post.image_status.has_image:
+                    print(f"🖼️  Image: {post.image_status.describe()}")
+                
+                if post.author_status.primary_author_id:
+                    print(f"✍️  Author: {post.author_status.status}")
+                
+                if post.category_status.applied > 0:
+                    print(f"🏷️  Categories: {post.category_status.status}")
+                
+                print(f"{C.YELLOW}Action needed: Manual posting required{C.ENDC}")
+        
+        # Section summary
+        print(f"\n→ {C.BOLD}Section '{section}' summary:{C.ENDC} " +
+              f"{bucket['Published']} published, " +
+              f"{bucket['Draft']} draft, " +
+              f"{len(section_skipped)} skipped, " +
+              f"{len(section_failed)} failed")
+
+    # Overall summary with percentages
+    total_posts = len(successful_posts) + len(failed_posts) + len(skipped_posts)
+    published_posts = sum(bucket['Published'] for bucket in by_section.values())
+    draft_posts = sum(bucket['Draft'] for bucket in by_section.values())
+    
+    print(f"\n{C.BOLD}{C.BLUE}" + "="*70)
+    print("OVERALL SUMMARY")
+    print("="*70 + f"{C.ENDC}")
+    print(f"{C.BOLD}Total sections:{C.ENDC} {len(by_section)}")
+    print(f"{C.BOLD}Total posts processed:{C.ENDC} {total_posts}")
+    published_pct = (published_posts/total_posts*100 if total_posts > 0 else 0)
+    draft_pct = (draft_posts/total_posts*100 if total_posts > 0 else 0)
+    skipped_pct = (len(skipped_posts)/total_posts*100 if total_posts > 0 else 0)
+    failed_pct = (len(failed_posts)/total_posts*100 if total_posts > 0 else 0)
+    
+    print(f"{C.BOLD}Published:{C.ENDC} {published_posts} ({published_pct:.1f}%)")
+    print(f"{C.BOLD}Draft:{C.ENDC} {draft_posts} ({draft_pct:.1f}%)")
+    print(f"{C.BOLD}Skipped:{C.ENDC} {len(skipped_posts)} ({skipped_pct:.1f}%)")
+    print(f"{C.BOLD}Failed:{C.ENDC} {len(failed_posts)} ({failed_pct:.1f}%)")
+    print(f"{C.BLUE}{C.BOLD}" + "="*70 + f"{C.ENDC}\n")
+
 def main(sheet_id):
     """Main function to process eligible posts with interactive keyboard controls."""
     successful_posts = []
     failed_posts = []
     skipped_posts = []  # New list to track skipped posts
 
+    # Published rows whose 'Online' checkbox still has to be ticked
+    pending_updates = []
+
+    # Every finished row is also appended to runs/run-<timestamp>.jsonl, so
+    # the outcome of a run survives an ESC or a crash
+    run_log = open_run_log()
+
     # Storage for headline and cutline options
     headlines_cache = []
     cutlines_cache = []
+    # Drive images still to be downloaded, in row order
+    upcoming_images = iter(())
     
     try:
-        print(f"{BLUE}{BOLD}Starting interactive processing...{ENDC}")
+        print(f"{C.BLUE}{C.BOLD}Starting interactive processing...{C.ENDC}")
         # Get eligible rows
         try:
             eligible_rows = get_eligible_rows(sheet_id)
-            print(f"{BLUE}Found {len(eligible_rows)} eligible posts\n{ENDC}")
+            print(f"{C.BLUE}Found {len(eligible_rows)} eligible posts\n{C.ENDC}")
         except Exception as e:
-            print(f"{RED}Error getting eligible rows: {e}{ENDC}")
+            print(f"{C.RED}Error getting eligible rows: {e}{C.ENDC}")
             return
         
-        # Parse headlines document (from first row's column P)
+        # Start downloading the documents in the background; each row only
+        # waits for its own redaction document, so reviewing the first post
+        # overlaps the downloads for the rest. Redaction documents are not
+        # parsed ahead of time, since parsing asks where the redaction starts.
+        # The headlines and cutlines documents are parsed in the background.
         if eligible_rows:
+            print(f"{C.BLUE}Downloading documents...{C.ENDC}")
             first_row = eligible_rows[0]
-            if first_row.get('headlines_url'):
-                print(f"{BLUE}Parsing headlines document...{ENDC}")
-                # Handle URL with or without tab parameter
-                headlines_doc_match = re.search(r'/document/d/([a-zA-Z0-9_-]+)', first_row['headlines_url'])
-                if headlines_doc_match:
-                    headlines_doc_id = headlines_doc_match.group(1)
-                    print(f"Extracting headlines from document ID: {headlines_doc_id}")
-                    print(f"Original URL: {first_row['headlines_url']}")
-                    headlines_cache = parse_headlines_doc(headlines_doc_id)
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                # Parse headlines document (from first row's column P)
+                headlines_future = None
+                if first_row.get('headlines_url'):
+                    print(f"{C.BLUE}Parsing headlines document...{C.ENDC}")
+                    # Handle URL with or without tab parameter
+                    headlines_doc_id = extract_doc_id(first_row['headlines_url'])
+                    if headlines_doc_id:
+                        print(f"Extracting headlines from document ID: {headlines_doc_id}")
+                        print(f"Original URL: {first_row['headlines_url']}")
+                        headlines_future = pool.submit(parse_headlines_doc, headlines_doc_id)
+                    else:
+                        print(f"{C.YELLOW}Invalid headlines document URL format.{C.ENDC}")
                 else:
-                    print(f"{YELLOW}Invalid headlines document URL format.{ENDC}")
-            else:
-                print(f"{YELLOW}No headlines document URL found.{ENDC}")
-                
-            # Parse cutlines document (from first row's column Q)
-            if first_row.get('cutlines_url'):
-                print(f"{BLUE}Parsing cutlines document...{ENDC}")
-                # Handle URL with or without tab parameter
-                cutlines_doc_match = re.search(r'/document/d/([a-zA-Z0-9_-]+)', first_row['cutlines_url'])
-                if cutlines_doc_match:
-                    cutlines_doc_id = cutlines_doc_match.group(1)
-                    print(f"Extracting cutlines from document ID: {cutlines_doc_id}")
-                    print(f"Original URL: {first_row['cutlines_url']}")
-                    cutlines_cache = parse_cutlines_doc(cutlines_doc_id)
+                    print(f"{C.YELLOW}No headlines document URL found.{C.ENDC}")
+
+                # Parse cutlines document (from first row's column Q)
+                cutlines_future = None
+                if first_row.get('cutlines_url'):
+                    print(f"{C.BLUE}Parsing cutlines document...{C.ENDC}")
+                    # Handle URL with or without tab parameter
+                    cutlines_doc_id = extract_doc_id(first_row['cutlines_url'])
+                    if cutlines_doc_id:
+                        print(f"Extracting cutlines from document ID: {cutlines_doc_id}")
+                        print(f"Original URL: {first_row['cutlines_url']}")
+                        cutlines_future = pool.submit(parse_cutlines_doc, cutlines_doc_id)
+                    else:
+                        print(f"{C.YELLOW}Invalid cutlines document URL format.{C.ENDC}")
                 else:
-                    print(f"{YELLOW}Invalid cutlines document URL format.{ENDC}")
-            else:
-                print(f"{YELLOW}No cutlines document URL found.{ENDC}")
+                    print(f"{C.YELLOW}No cutlines document URL found.{C.ENDC}")
+
+                fetch_docs_async(doc_id for doc_id in (extract_doc_id(row['doc_url']) for row in eligible_rows) if doc_id)
+                image_metadata = prefetch_metadata(extract_file_id(row['image_url']) for row in eligible_rows if row.get('image_url'))
+                # Image bytes download in the background while posts are reviewed
+                upcoming_images = iter(image_metadata)
+                for file_id in islice(upcoming_images, IMAGE_PREFETCH_AHEAD):
+                    download_image_async(file_id)
+
+                # Resolve every row's author and the category list up front
+                prefetch_author_ids(row['author_names'][0] for row in eligible_rows if row['author_names'])
+                try:
+                    get_wordpress_categories()
+                except Exception as e:
+                    print(f"{C.YELLOW}Could not prefetch WordPress categories: {e}{C.ENDC}")
+
+                if headlines_future:
+                    headlines_cache = headlines_future.result()
+                if cutlines_future:
+                    cutlines_cache = cutlines_future.result()
+
+        # The prompts show the options grouped by category; group them once
+        headlines_by_category = group_by_category(headlines_cache)
+        cutlines_by_category = group_by_category(cutlines_cache)
 
         for row in eligible_rows:
-            print(f"\n{BOLD}Loading row {row['row']} (Section: {row['section']}){ENDC}")
+            print(f"\n{C.BOLD}Loading row {row['row']} (Section: {row['section']}){C.ENDC}")
+            next_image = next(upcoming_images, None)
+            if next_image:
+                download_image_async(next_image)
             
             # Enhanced post info with detailed status tracking
-            post_info = {
-                'row': row['row'],
-                'headline': 'Unknown',  # Default value
-                'authors': row['author_names'],
-                'photographer': row.get('photographer_name'),
-                'categories': row['categories'],
-                'section': row['section'],
-                
-                # Status tracking fields
-                'status': 'Skipped',  # Default is now 'Skipped'
-                'post_url': None,
-                'post_id': None,
-                'image_status': {
-                    'has_image': False,
-                    'status': 'No image found',
-                    'media_id': None
-                },
-                'category_status': {
-                    'requested': len(row['categories']),
-                    'applied': 0,
-                    'status': 'Not processed'
-                },
-                'author_status': {
-                    'requested': len(row['author_names']),
-                    'applied': 0,
-                    'primary_author_id': None,
-                    'status': 'Not processed'
-                },
-                'sheet_update_status': 'Not updated',
-                'error_details': None
-            }
+            post_info = PostInfo(
+                row=row['row'],
+                section=row['section'],
+                authors=row['author_names'],
+                categories=row['categories'],
+                photographer=row.get('photographer_name'),
+                category_status=CategoryStatus(requested=len(row['categories'])),
+                author_status=AuthorStatus(requested=len(row['author_names']))
+            )
 
             try:
                 # Extract Google Doc ID for the redaction document (Column E)
-                doc_match = re.search(r'/document/d/([a-zA-Z0-9_-]+)', row['doc_url'])
-                if not doc_match:
+                doc_id = extract_doc_id(row['doc_url'])
+                if not doc_id:
                     raise ValueError('Invalid Google Doc URL for redaction')
-                doc_id = doc_match.group(1)
 
                 # Parse redaction document interactively
                 redaction = parse_redaction_doc(doc_id)
@@ -126,16 +421,16 @@ def main(sheet_id):
                 redaction_preview = ' '.join(redaction.split()[:30])
                 
                 # Now select headline interactively from cached headlines
-                headline = select_headline_interactively(headlines_cache, row, redaction_preview)
+                headline = select_headline_interactively(headlines_by_category, row, redaction_preview)
                 
                 # Only ask for cutlines if there's an image URL in column N
                 if row.get('image_url'):
                     # Select cutline interactively from cached cutlines
-                    cutlines = select_cutline_interactively(cutlines_cache, headline)
+                    cutlines = select_cutline_interactively(cutlines_by_category, headline)
                 else:
                     # Skip cutline selection if no image URL
                     cutlines = ""
-                    print(f"{YELLOW}No image URL found in Column N. Skipping cutline selection.{ENDC}")
+                    print(f"{C.YELLOW}No image URL found in Column N. Skipping cutline selection.{C.ENDC}")
                 
                 # Create sections dictionary for compatibility with existing code
                 sections = {
@@ -146,39 +441,19 @@ def main(sheet_id):
                 }
                 
                 # Update post info with headline
-                post_info['headline'] = headline
+                post_info.headline = headline
 
                 # Handle featured image - now with modified fallback mechanism
                 featured_media_id = None
                 image_caption = sections.get('Cutlines', '')
                 
-                # First attempt with the image URL from spreadsheet Column N
+                # Start the upload of the image from spreadsheet Column N in the
+                # background, so it overlaps the author and category lookups
+                image_future = None
                 if row.get('image_url'):
-                    print(f"{BLUE}Attempting to use image URL from spreadsheet (Column N)...{ENDC}")
+                    print(f"{C.BLUE}Attempting to use image URL from spreadsheet (Column N)...{C.ENDC}")
                     image_url = row['image_url']
-                    featured_media_id = process_image_from_url(image_url, image_caption, doc_id)
-                    
-                    if featured_media_id:
-                        post_info['image_status']['has_image'] = True
-                        post_info['image_status']['status'] = 'Uploaded successfully from spreadsheet URL'
-                        post_info['image_status']['media_id'] = featured_media_id
-                        print(f"{GREEN}Successfully uploaded image with ID: {featured_media_id}{ENDC}")
-                    else:
-                        print(f"{YELLOW}Initial image upload from spreadsheet URL failed. Offering alternatives...{ENDC}")
-                        
-                        # Enable manual fallback for image upload - only when the initial upload fails
-                        featured_media_id = handle_image_fallback(image_caption, doc_id)
-                        
-                        if featured_media_id:
-                            post_info['image_status']['has_image'] = True
-                            post_info['image_status']['status'] = 'Uploaded successfully via fallback method'
-                            post_info['image_status']['media_id'] = featured_media_id
-                        else:
-                            post_info['image_status']['status'] = 'All image upload attempts failed'
-                else:
-                    print(f"{YELLOW}No image URL found in Column N. Skipping image upload.{ENDC}")
-                    # Don't offer fallback options when there's no image URL
-                    post_info['image_status']['status'] = 'No image URL provided'
+                    image_future = process_image_from_url_async(image_url, image_caption, doc_id)
 
                 # Process author information - ONLY DO THIS ONCE
                 author_id = None
@@ -186,36 +461,54 @@ def main(sheet_id):
                     author_name = row['author_names'][0]
                     author_id = get_or_create_author_id(author_name)
                     if author_id:
-                        post_info['author_status']['primary_author_id'] = author_id
-                        post_info['author_status']['applied'] = 1
-                        post_info['author_status']['status'] = 'Primary author set'
+                        post_info.author_status.primary_author_id = author_id
+                        post_info.author_status.applied = 1
+                        post_info.author_status.status = 'Primary author set'
                         if len(row['author_names']) > 1:
-                            post_info['author_status']['status'] += f", {len(row['author_names']) - 1} co-authors need manual addition"
+                            post_info.author_status.status += f", {len(row['author_names']) - 1} co-authors need manual addition"
                     else:
-                        post_info['author_status']['status'] = 'Author creation failed'
+                        post_info.author_status.status = 'Author creation failed'
 
                 # Process category information - ONLY DO THIS ONCE
                 category_ids = []
                 if row['categories']:
                     category_ids = get_category_ids(row['categories'])
-                    post_info['category_status']['applied'] = len(category_ids)
+                    post_info.category_status.applied = len(category_ids)
                     if category_ids:
                         if len(category_ids) == len(row['categories']):
-                            post_info['category_status']['status'] = 'All categories applied'
+                            post_info.category_status.status = 'All categories applied'
                         else:
-                            post_info['category_status']['status'] = f"{len(category_ids)}/{len(row['categories'])} categories found"
+                            post_info.category_status.status = f"{len(category_ids)}/{len(row['categories'])} categories found"
                     else:
-                        post_info['category_status']['status'] = 'No categories found'
+                        post_info.category_status.status = 'No categories found'
+
+                # First attempt with the image URL from spreadsheet Column N
+                if image_future:
+                    featured_media_id, image_output = image_future.result()
+                    sys.stdout.write(image_output)
+                    
+                    if featured_media_id:
+                        post_info.image_status.source = ImageSource.SPREADSHEET
+                        post_info.image_status.media_id = featured_media_id
+                        print(f"{C.GREEN}Successfully uploaded image with ID: {featured_media_id}{C.ENDC}")
+                    else:
+                        print(f"{C.YELLOW}Initial image upload from spreadsheet URL failed. Offering alternatives...{C.ENDC}")
+                        
+                        # Enable manual fallback for image upload - only when the initial upload fails
+                        featured_media_id = handle_image_fallback(image_caption, doc_id)
+                        
+                        if featured_media_id:
+                            post_info.image_status.source = ImageSource.FALLBACK
+                            post_info.image_status.media_id = featured_media_id
+                        else:
+                            post_info.image_status.reason = 'All image upload attempts failed'
+                else:
+                    print(f"{C.YELLOW}No image URL found in Column N. Skipping image upload.{C.ENDC}")
+                    # Don't offer fallback options when there's no image URL
+                    post_info.image_status.reason = 'No image URL provided'
 
                 # Determine the image source for display
-                image_source = "None"
-                if row.get('image_url'):
-                    if post_info['image_status']['status'] == 'Uploaded successfully from spreadsheet URL':
-                        image_source = "Column N from spreadsheet"
-                    elif post_info['image_status']['status'] == 'Uploaded successfully via fallback method':
-                        image_source = "Alternative URL (fallback)"
-                    elif post_info['image_status']['status'] == 'Uploaded successfully via manual input':
-                        image_source = "Manual input (local file)"
+                image_source = IMAGE_SOURCE_LABELS[post_info.image_status.source]
 
                 # Display post details and wait for keyboard input
                 display_post_details(
@@ -225,6 +518,15 @@ def main(sheet_id):
                     image_source
                 )
                 
+                # Post content with pre-looked-up IDs; the status is chosen below
+                post_content = {
+                    'Headline': sections['Headline'],
+                    'Redaction': sections['Redaction'],
+                    'featured_media_id': featured_media_id,
+                    'author_id': author_id,
+                    'category_ids': category_ids
+                }
+
                 # Wait for keyboard command
                 while True:
                     print("\nWaiting for command...")
@@ -232,225 +534,122 @@ def main(sheet_id):
                     
                     # Check for ESC key (ASCII 27)
                     if key == '\x1b':  # ESC key
-                        print(f"{RED}Exiting program...{ENDC}")
+                        print(f"{C.RED}Exiting program...{C.ENDC}")
                         return  # Exit the main function
                     
                     elif key in ['\r', '\n']:  # ENTER = Publish
-                        print(f"{GREEN}Publishing post...{ENDC}")
-                        # Create post content with pre-looked-up IDs
-                        post_content = {
-                            'Headline': sections['Headline'],
-                            'Redaction': sections['Redaction'],
-                            'featured_media_id': featured_media_id,
-                            'author_id': author_id,
-                            'category_ids': category_ids,
-                            'status': 'publish'  # Set status to publish
-                        }
-                        
+                        print(f"{C.GREEN}Publishing post...{C.ENDC}")
                         # Create and publish WordPress post
                         post_response = create_wordpress_post_with_details(post_content, status='publish')
                         if post_response['success']:
-                            post_info['status'] = 'Published'
-                            post_info['post_id'] = post_response['post_id']
-                            post_info['post_url'] = post_response['post_url']
-                            
-                            # Update verification statuses
-                            if 'featured_media_verified' in post_response:
-                                if post_response['featured_media_verified']:
-                                    post_info['image_status']['status'] += ' and verified'
-                                else:
-                                    post_info['image_status']['status'] += ' but verification failed'
+                            apply_post_response(post_info, post_response, 'Published')
                             
-                            if 'categories_verified' in post_response:
-                                if post_response['categories_verified']:
-                                    post_info['category_status']['status'] += ' and verified'
-                                else:
-                                    post_info['category_status']['status'] += ' but verification failed'
-                            
-                            # Update spreadsheet status
-                            sheet_updated = update_online_status(sheet_id, row['online_cell'])
-                            post_info['sheet_update_status'] = 'Updated successfully' if sheet_updated else 'Update failed'
+                            # The 'Online' checkbox is what keeps the next run from
+                            # publishing this row again, so it is ticked right away
+                            # rather than batched until the end of the run, where a
+                            # killed process would lose it
+                            pending_updates.append((row['online_cell'], post_info))
+                            post_info.sheet_update_status = 'Pending update'
                             
                             successful_posts.append(post_info)
-                            print(f"{GREEN}Post published successfully:{ENDC} {post_response['post_url']}")
+                            print(f"{C.GREEN}Post published successfully:{C.ENDC} {post_response['post_url']}")
+                            flush_online_updates(sheet_id, pending_updates, run_log)
                         else:
-                            post_info['error_details'] = post_response['error']
-                            post_info['status'] = 'Failed'
+                            post_info.error_details = post_response['error']
+                            post_info.status = 'Failed'
                             failed_posts.append(post_info)
-                            print(f"{RED}Failed to publish post: {post_response['error']}{ENDC}")
+                            print(f"{C.RED}Failed to publish post: {post_response['error']}{C.ENDC}")
                         break
                         
                     elif key in ['\b', '\x08', '\x7f']:  # BACKSPACE = Create as Draft
-                        print(f"{YELLOW}Creating post as draft...{ENDC}")
-                        # Create post content with pre-looked-up IDs
-                        post_content = {
-                            'Headline': sections['Headline'],
-                            'Redaction': sections['Redaction'],
-                            'featured_media_id': featured_media_id,
-                            'author_id': author_id,
-                            'category_ids': category_ids,
-                            'status': 'draft'  # Set status to draft
-                        }
-                        
+                        print(f"{C.YELLOW}Creating post as draft...{C.ENDC}")
                         # Create WordPress post as draft
                         post_response = create_wordpress_post_with_details(post_content, status='draft')
                         if post_response['success']:
-                            post_info['status'] = 'Draft'
-                            post_info['post_id'] = post_response['post_id']
-                            post_info['post_url'] = post_response['post_url']
-                            
-                            # Update verification statuses
-                            if 'featured_media_verified' in post_response:
-                                if post_response['featured_media_verified']:
-                                    post_info['image_status']['status'] += ' and verified'
-                                else:
-                                    post_info['image_status']['status'] += ' but verification failed'
-                            
-                            if 'categories_verified' in post_response:
-                                if post_response['categories_verified']:
-                                    post_info['category_status']['status'] += ' and verified'
-                                else:
-                                    post_info['category_status']['status'] += ' but verification failed'
+                            apply_post_response(post_info, post_response, 'Draft')
                             
                             # No need to update spreadsheet for drafts
-                            post_info['sheet_update_status'] = 'Not updated (draft)'
+                            post_info.sheet_update_status = 'Not updated (draft)'
                             
                             successful_posts.append(post_info)
-                            print(f"{YELLOW}Post saved as draft:{ENDC} {post_response['post_url']}")
+                            print(f"{C.YELLOW}Post saved as draft:{C.ENDC} {post_response['post_url']}")
                         else:
-                            post_info['error_details'] = post_response['error']
-                            post_info['status'] = 'Failed'
+                            post_info.error_details = post_response['error']
+                            post_info.status = 'Failed'
                             failed_posts.append(post_info)
-                            print(f"{RED}Failed to create draft: {post_response['error']}{ENDC}")
+                            print(f"{C.RED}Failed to create draft: {post_response['error']}{C.ENDC}")
                         break
                         
                     elif key == ' ':  # SPACE = Skip
-                        print(f"{BLUE}Skipping this post...{ENDC}")
-                        post_info['status'] = 'Skipped'
+                        print(f"{C.BLUE}Skipping this post...{C.ENDC}")
+                        post_info.status = 'Skipped'
                         skipped_posts.append(post_info)
                         break
                         
                     else:
-                        print(f"{ORANGE}Unknown command. Please use ENTER, BACKSPACE, SPACE, or ESC.{ENDC}")
+                        print(f"{C.ORANGE}Unknown command. Please use ENTER, BACKSPACE, SPACE, or ESC.{C.ENDC}")
+
+                record_post(run_log, post_info)
+                release_row_image(row)
 
             except Exception as e:
                 error_message = str(e)
-                post_info['error_details'] = error_message
-                post_info['status'] = 'Failed'
+                post_info.error_details = error_message
+                post_info.status = 'Failed'
                 failed_posts.append(post_info)
-                print(f"{RED}Error processing row {row['row']}: {error_message}{ENDC}")
-                print(f"{YELLOW}Press any key to continue to the next post...{ENDC}")
+                record_post(run_log, post_info)
+                release_row_image(row)
+                print(f"{C.RED}Error processing row {row['row']}: {error_message}{C.ENDC}")
+                print(f"{C.YELLOW}Press any key to continue to the next post...{C.ENDC}")
                 get_single_key()
                 continue
 
-        # Print detailed summary grouped by section
-        print(f"\n{BOLD}{BLUE}" + "="*70)
-        print("POSTING SUMMARY BY SECTION")
-        print("="*70 + f"{ENDC}")
+        flush_online_updates(sheet_id, pending_updates, run_log)
 
-        # Get all unique sections
-        all_sections = set([post['section'] for post in successful_posts + failed_posts + skipped_posts])
-        
-        # Create summary for each section
-        for section in sorted(all_sections):
-            print(f"\n{BOLD}{BLUE}📌 SECTION: {section}{ENDC}")
-            print("-"*70)
-            
-            # Filter successful posts for this section
-            section_successful = [post for post in successful_posts if post['section'] == section]
-            if section_successful:
-                print(f"\n{GREEN}{BOLD}✅ POSTS CREATED SUCCESSFULLY{ENDC}")
-                print("-"*50)
-                for post in section_successful:
-                    print(f"\n{BOLD}Row {post['row']}: {post['headline']} ({post['status']}){ENDC}")
-                    print(f"🔗 Post URL: {post['post_url']}")
-                    
-                    # Author information
-                    if len(post['authors']) > 1:
-                        print(f"✍️  {BOLD}Authors:{ENDC}")
-                        print(f"   Primary author: {post['authors'][0]} (ID: {post['author_status']['primary_author_id']})")
-                        print(f"   Co-authors to add manually: {', '.join(post['authors'][1:])}")
-                    else:
-                        print(f"✍️  {BOLD}Author:{ENDC} {post['authors'][0] if post['authors'] else 'No author specified'}")
-                    print(f"    Status: {post['author_status']['status']}")
-                    
-                    # Category information
-                    print(f"🏷️  {BOLD}Categories:{ENDC}")
-                    print(f"    Requested ({post['category_status']['requested']}): {', '.join(post['categories'])}")
-                    print(f"    Status: {post['category_status']['status']}")
-                    
-                    # Image information
-                    print(f"🖼️  {BOLD}Featured Image:{ENDC}")
-                    print(f"    Status: {post['image_status']['status']}")
-                    if post['photographer']:
-                        print(f"    Photographer: {post['photographer']}")
-                        
-                    # Spreadsheet update status
-                    print(f"📊 {BOLD}Spreadsheet:{ENDC} {post['sheet_update_status']}")
-            
-            # Filter skipped posts for this section
-            section_skipped = [post for post in skipped_posts if post['section'] == section]
-            if section_skipped:
-                print(f"\n{BLUE}{BOLD}⏭️ SKIPPED POSTS{ENDC}")
-                print("-"*50)
-                for post in section_skipped:
-                    print(f"Row {post['row']}: {post['headline']}")
-            
-            # Filter failed posts for this section
-            section_failed = [post for post in failed_posts if post['section'] == section]
-            if section_failed:
-                print(f"\n{RED}{BOLD}❌ POSTS WITH ERRORS{ENDC}")
-                print("-"*50)
-                for post in section_failed:
-                    print(f"\n{BOLD}Row {post['row']}: {post['headline']}{ENDC}")
-                    
-                    # Error details
-                    print(f"{RED}Error: {post['error_details']}{ENDC}")
-                    
-                    # Display any progress that was made before failure
-                    if post['image_status']['has_image']:
-                        print(f"🖼️  Image: {post['image_status']['status']}")
-                    
-                    if post['author_status']['primary_author_id']:
-                        print(f"✍️  Author: {post['author_status']['status']}")
-                    
-                    if post['category_status']['applied'] > 0:
-                        print(f"🏷️  Categories: {post['category_status']['status']}")
-                    
-                    print(f"{YELLOW}Action needed: Manual posting required{ENDC}")
-            
-            # Section summary
-            print(f"\n→ {BOLD}Section '{section}' summary:{ENDC} " +
-                  f"{len([p for p in section_successful if p['status'] == 'Published'])} published, " +
-                  f"{len([p for p in section_successful if p['status'] == 'Draft'])} draft, " +
-                  f"{len(section_skipped)} skipped, " +
-                  f"{len(section_failed)} failed")
-
-        # Overall summary with percentages
-        total_posts = len(successful_posts) + len(failed_posts) + len(skipped_posts)
-        published_posts = len([p for p in successful_posts if p['status'] == 'Published'])
-        draft_posts = len([p for p in successful_posts if p['status'] == 'Draft'])
-        
-        print(f"\n{BOLD}{BLUE}" + "="*70)
-        print("OVERALL SUMMARY")
-        print("="*70 + f"{ENDC}")
-        print(f"{BOLD}Total sections:{ENDC} {len(all_sections)}")
-        print(f"{BOLD}Total posts processed:{ENDC} {total_posts}")
-        published_pct = (published_posts/total_posts*100 if total_posts > 0 else 0)
-        draft_pct = (draft_posts/total_posts*100 if total_posts > 0 else 0)
-        skipped_pct = (len(skipped_posts)/total_posts*100 if total_posts > 0 else 0)
-        failed_pct = (len(failed_posts)/total_posts*100 if total_posts > 0 else 0)
-        
-        print(f"{BOLD}Published:{ENDC} {published_posts} ({published_pct:.1f}%)")
-        print(f"{BOLD}Draft:{ENDC} {draft_posts} ({draft_pct:.1f}%)")
-        print(f"{BOLD}Skipped:{ENDC} {len(skipped_posts)} ({skipped_pct:.1f}%)")
-        print(f"{BOLD}Failed:{ENDC} {len(failed_posts)} ({failed_pct:.1f}%)")
-        print(f"{BLUE}{BOLD}" + "="*70 + f"{ENDC}\n")
+        # Print detailed summary grouped by section. It is built in memory
+        # and written in one go rather than as hundreds of small writes
+        summary = io.StringIO()
+        with redirect_stdout(summary):
+            print_summary(successful_posts, skipped_posts, failed_posts)
+        sys.stdout.write(summary.getvalue())
+        sys.stdout.flush()
 
     except Exception as e:
-        print(f"{RED}{BOLD}Fatal error: {e}{ENDC}")
+        print(f"{C.RED}{C.BOLD}Fatal error: {e}{C.ENDC}")
+    finally:
+        # Prefetches for rows that will not be reviewed are dropped
+        cancel_doc_fetches()
+        cancel_image_io()
+        # Still record the posts published before an ESC or a fatal error
+        flush_online_updates(sheet_id, pending_updates, run_log)
+        if run_log:
+            run_log.close()
 
 if __name__ == '__main__':
+    if '--no-color' in sys.argv[1:]:
+        C.disable()
+    # Log records share stdout with the prompts and review screens. INFO and
+    # above are written synchronously so they land in order with them; only
+    # the DEBUG chatter from the download threads is queued and written by a
+    # listener thread, so no thread blocks on a slow terminal
+    log_handler = logging.StreamHandler(sys.stdout)
+    log_handler.setLevel(logging.INFO)
+    debug_handler = logging.StreamHandler(sys.stdout)
+    debug_handler.setFormatter(logging.Formatter('%(message)s'))
+    log_queue = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, debug_handler)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(lambda record: record.levelno < logging.INFO)
+    logging.basicConfig(
+        level=logging.DEBUG if '--verbose' in sys.argv[1:] else logging.INFO,
+        format='%(message)s',
+        handlers=[log_handler, queue_handler]
+    )
+    log_listener.start()
+    # Registered after constants' shutdown hook, so it runs first and
+    # drains the queue while the process is still fully alive
+    atexit.register(log_listener.stop)
+
     # The Sheet ID is the long string in the URL of the Google Sheet
     # Ask user for the spreadsheet URL
     sheet_url = input("Enter Google Sheets URL: ").strip()
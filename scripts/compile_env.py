@@ -0,0 +1,39 @@
+"""
+Compile the project's `.env` file into `_env_compiled.py`.
+
+constants.py imports the generated module when it exists, so short-lived runs
+load the settings from cached bytecode instead of re-parsing `.env`.
+Re-run this script whenever `.env` changes.
+"""
+import os
+import sys
+
+from dotenv import dotenv_values
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def compile_env(env_path, output_path):
+    """Write every key/value pair in `env_path` to `output_path` as a Python dict literal."""
+    values = {key: value for key, value in dotenv_values(env_path).items() if value is not None}
+
+    lines = [
+        "# Generated by scripts/compile_env.py from .env - do not edit or commit.",
+        "ENV = {",
+    ]
+    lines.extend(f"    {key!r}: {value!r}," for key, value in values.items())
+    lines.append("}")
+
+    with open(output_path, 'w') as fh:
+        fh.write('\n'.join(lines) + '\n')
+    return len(values)
+
+if __name__ == '__main__':
+    env_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(PROJECT_ROOT, '.env')
+    output_path = os.path.join(PROJECT_ROOT, '_env_compiled.py')
+
+    if not os.path.exists(env_path):
+        print(f"No .env file found at {env_path}")
+        sys.exit(1)
+
+    count = compile_env(env_path, output_path)
+    print(f"Wrote {count} variables to {output_path}")
@@ -3,9 +3,7 @@ import termios
 import tty
 import platform
 
-from constants import (
-    GREEN, YELLOW, RED, BLUE, ENDC, BOLD, ORANGE
-)
+from constants import C
 
 def get_single_key():
     """Get a single keypress from the user, cross-platform."""
@@ -19,29 +17,32 @@ def get_single_key():
         termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
     return ch
 
-def select_headline_interactively(headlines, row_info, redaction_preview):
+def group_by_category(options):
+    """
+    Group parsed headline or cutline options by their 'category', keeping
+    document order. Done once per run; the selection prompts take the result.
+    """
+    options_by_category = {}
+    for option in options:
+        options_by_category.setdefault(option.get('category', 'Uncategorized'), []).append(option)
+    return options_by_category
+
+def select_headline_interactively(headlines_by_category, row_info, redaction_preview):
     """
     Present headline options to user for interactive selection.
+    headlines_by_category is the output of group_by_category.
     Returns the selected headline text.
     """
     # If no headlines found
-    if not headlines:
-        print(f"{YELLOW}No headline options found. Please enter a headline manually:{ENDC}")
+    if not headlines_by_category:
+        print(f"{C.YELLOW}No headline options found. Please enter a headline manually:{C.ENDC}")
         return input("Headline: ").strip()
     
-    print(f"\n{BLUE}{BOLD}Processing row {row_info['row']} (Section: {row_info['section']}){ENDC}")
-    print(f"\n{BOLD}Redaction preview:{ENDC}")
+    print(f"\n{C.BLUE}{C.BOLD}Processing row {row_info['row']} (Section: {row_info['section']}){C.ENDC}")
+    print(f"\n{C.BOLD}Redaction preview:{C.ENDC}")
     print(f"{redaction_preview[:150]}...")
     
-    print(f"\n{BOLD}What is the headline of this post?{ENDC}")
-    
-    # Group headlines by category for easier selection
-    headlines_by_category = {}
-    for headline in headlines:
-        category = headline.get('category', 'Uncategorized')
-        if category not in headlines_by_category:
-            headlines_by_category[category] = []
-        headlines_by_category[category].append(headline)
+    print(f"\n{C.BOLD}What is the headline of this post?{C.ENDC}")
     
     # Assign numbers 1, 2, 3, etc. to each headline
     choices = {}
@@ -49,46 +50,39 @@ def select_headline_interactively(headlines, row_info, redaction_preview):
     
     # Print headlines grouped by category
     for category, category_headlines in headlines_by_category.items():
-        print(f"\n{BOLD}{category}:{ENDC}")
+        print(f"\n{C.BOLD}{category}:{C.ENDC}")
         for headline in category_headlines:
             choices[str(num_idx)] = headline
-            print(f"{BOLD}{num_idx}. {headline['slug']}: {headline['headline']}{ENDC}")
+            print(f"{C.BOLD}{num_idx}. {headline['slug']}: {headline['headline']}{C.ENDC}")
             num_idx += 1
     
-    print(f"\n{YELLOW}Enter number (1-{len(choices)}) or type a custom headline:{ENDC}")
+    print(f"\n{C.YELLOW}Enter number (1-{len(choices)}) or type a custom headline:{C.ENDC}")
     
     user_input = input("> ").strip()
     
     # Check if the input is a valid number choice
     if user_input in choices:
         selected_headline = choices[user_input]
-        print(f"{GREEN}Selected: {selected_headline['headline']}{ENDC}")
+        print(f"{C.GREEN}Selected: {selected_headline['headline']}{C.ENDC}")
         return selected_headline['headline']
     else:
         # Treat input as custom headline
-        print(f"{GREEN}Using custom headline: {user_input}{ENDC}")
+        print(f"{C.GREEN}Using custom headline: {user_input}{C.ENDC}")
         return user_input
 
-def select_cutline_interactively(cutlines, headline):
+def select_cutline_interactively(cutlines_by_category, headline):
     """
     Present cutline options to user for interactive selection.
+    cutlines_by_category is the output of group_by_category.
     Returns the selected cutline text.
     """
     # If no cutlines found or no image
-    if not cutlines:
-        print(f"{YELLOW}No cutline options found. Enter a cutline or press Enter to skip:{ENDC}")
+    if not cutlines_by_category:
+        print(f"{C.YELLOW}No cutline options found. Enter a cutline or press Enter to skip:{C.ENDC}")
         return input("Cutline: ").strip()
     
-    print(f"\n{BOLD}What is the cutline for the featured image?{ENDC}")
-    print(f"{BLUE}(For headline: {headline}){ENDC}")
-    
-    # Group cutlines by category for easier selection
-    cutlines_by_category = {}
-    for cutline in cutlines:
-        category = cutline.get('category', 'Uncategorized')
-        if category not in cutlines_by_category:
-            cutlines_by_category[category] = []
-        cutlines_by_category[category].append(cutline)
+    print(f"\n{C.BOLD}What is the cutline for the featured image?{C.ENDC}")
+    print(f"{C.BLUE}(For headline: {headline}){C.ENDC}")
     
     # Assign numbers 1, 2, 3, etc. to each cutline
     choices = {}
@@ -96,7 +90,7 @@ def select_cutline_interactively(cutlines, headline):
     
     # Print cutlines grouped by category
     for category, category_cutlines in cutlines_by_category.items():
-        print(f"\n{BOLD}{category}:{ENDC}")
+        print(f"\n{C.BOLD}{category}:{C.ENDC}")
         for cutline in category_cutlines:
             choices[str(num_idx)] = cutline
             
@@ -105,15 +99,15 @@ def select_cutline_interactively(cutlines, headline):
             if cutline.get('photo_credit'):
                 display_text += f" PHOTO CREDIT: {cutline['photo_credit']}"
                 
-            print(f"{BOLD}{num_idx}. {cutline['slug']}: {display_text}{ENDC}")
+            print(f"{C.BOLD}{num_idx}. {cutline['slug']}: {display_text}{C.ENDC}")
             num_idx += 1
     
-    print(f"\n{YELLOW}Enter number (1-{len(choices)}) or type a custom cutline or press Enter to skip:{ENDC}")
+    print(f"\n{C.YELLOW}Enter number (1-{len(choices)}) or type a custom cutline or press Enter to skip:{C.ENDC}")
     
     user_input = input("> ").strip()
     
     if not user_input:
-        print(f"{YELLOW}Skipping cutline.{ENDC}")
+        print(f"{C.YELLOW}Skipping cutline.{C.ENDC}")
         return ""
     
     # Check if the input is a valid number choice
@@ -125,61 +119,61 @@ def select_cutline_interactively(cutlines, headline):
         if selected_cutline.get('photo_credit'):
             cutline_text += f" PHOTO CREDIT: {selected_cutline['photo_credit']}"
             
-        print(f"{GREEN}Selected: {cutline_text}{ENDC}")
+        print(f"{C.GREEN}Selected: {cutline_text}{C.ENDC}")
         return cutline_text
     else:
         # Treat input as custom cutline
-        print(f"{GREEN}Using custom cutline: {user_input}{ENDC}")
+        print(f"{C.GREEN}Using custom cutline: {user_input}{C.ENDC}")
         return user_input
 
 def display_post_details(sections, row, featured_media_available=False, image_source="Column N from spreadsheet"):
     """Display post details for review in a formatted way."""
-    print(f"\n{BOLD}{BLUE}" + "="*70)
+    print(f"\n{C.BOLD}{C.BLUE}" + "="*70)
     print(f"POST REVIEW - ROW {row['row']} - SECTION: {row['section']}")
-    print("="*70 + f"{ENDC}")
+    print("="*70 + f"{C.ENDC}")
     
     # Display headline
-    print(f"\n{BOLD}Headline:{ENDC}")
+    print(f"\n{C.BOLD}Headline:{C.ENDC}")
     print(f"{sections['Headline']}")
     
     # Display authors
-    print(f"\n{BOLD}Authors:{ENDC}")
+    print(f"\n{C.BOLD}Authors:{C.ENDC}")
     if row['author_names']:
         for i, author in enumerate(row['author_names']):
             print(f"  {'Primary: ' if i == 0 else 'Co-author: '}{author}")
     else:
-        print(f"{YELLOW}  No authors specified{ENDC}")
+        print(f"{C.YELLOW}  No authors specified{C.ENDC}")
     
     # Display categories
-    print(f"\n{BOLD}Categories:{ENDC}")
+    print(f"\n{C.BOLD}Categories:{C.ENDC}")
     if row['categories']:
         for category in row['categories']:
             print(f"  {category}")
     else:
-        print(f"{YELLOW}  No categories specified{ENDC}")
+        print(f"{C.YELLOW}  No categories specified{C.ENDC}")
     
     # Display featured image status
-    print(f"\n{BOLD}Featured Image:{ENDC}")
+    print(f"\n{C.BOLD}Featured Image:{C.ENDC}")
     if featured_media_available:
-        print(f"{GREEN}  Image available{ENDC}")
+        print(f"{C.GREEN}  Image available{C.ENDC}")
         
         # Display image source - now using the parameter
         print(f"  Source: {image_source}")
         
         # Display cutlines if available
         if sections.get('Cutlines'):
-            print(f"\n{BOLD}Cutlines:{ENDC}")
+            print(f"\n{C.BOLD}Cutlines:{C.ENDC}")
             print(f"  {sections['Cutlines']}")
         
         # Display photographer if available
         if row.get('photographer_name'):
-            print(f"\n{BOLD}Photographer:{ENDC}")
+            print(f"\n{C.BOLD}Photographer:{C.ENDC}")
             print(f"  {row['photographer_name']}")
     else:
-        print(f"{YELLOW}  No image available{ENDC}")
+        print(f"{C.YELLOW}  No image available{C.ENDC}")
     
     # Display redaction (content)
-    print(f"\n{BOLD}Content:{ENDC}")
+    print(f"\n{C.BOLD}Content:{C.ENDC}")
     redaction_lines = sections['Redaction'].split('\n')
     
     # Only show first 5 lines and indicate if there's more
@@ -188,13 +182,13 @@ def display_post_details(sections, row, featured_media_available=False, image_so
             print(f"  {line[:100]}{'...' if len(line) > 100 else ''}")
     
     if len(redaction_lines) > 5:
-        print(f"  {YELLOW}... and {len(redaction_lines) - 5} more lines ...{ENDC}")
+        print(f"  {C.YELLOW}... and {len(redaction_lines) - 5} more lines ...{C.ENDC}")
     
     # Display commands
-    print(f"\n{BOLD}{BLUE}" + "-"*70)
+    print(f"\n{C.BOLD}{C.BLUE}" + "-"*70)
     print("ACTIONS:")
-    print(f"{GREEN}[ENTER]{ENDC} Publish post and continue")
-    print(f"{YELLOW}[⟸ BACKSPACE]{ENDC} Create as draft and continue")
-    print(f"{BLUE}[SPACEBAR]{ENDC} Skip this post and continue")
-    print(f"{RED}[ESC]{ENDC} Exit program")
-    print("-"*70 + f"{ENDC}")
+    print(f"{C.GREEN}[ENTER]{C.ENDC} Publish post and continue")
+    print(f"{C.YELLOW}[⟸ BACKSPACE]{C.ENDC} Create as draft and continue")
+    print(f"{C.BLUE}[SPACEBAR]{C.ENDC} Skip this post and continue")
+    print(f"{C.RED}[ESC]{C.ENDC} Exit program")
+    print("-"*70 + f"{C.ENDC}")
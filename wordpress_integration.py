@@ -1,14 +1,90 @@
 import re
 import requests
-import os
 import io
 import time
 from datetime import datetime
 from base64 import b64encode
 import random
 import string
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from constants import WP_URL, WP_USER, WP_PASSWORD, GREEN, YELLOW, RED, BLUE, ENDC, BOLD
+from constants import CONFIG
+
+# One keep-alive session for every WordPress REST call (and the media
+# uploads in image_processing), so each request reuses a pooled TLS
+# connection. Rate limits and server errors are retried with backoff;
+# urllib3 only retries those for idempotent methods, never for POSTs.
+WP_AUTH_HEADER = b'Basic ' + b64encode(f"{CONFIG.wp_user}:{CONFIG.wp_password}".encode())
+WP_SESSION = requests.Session()
+WP_SESSION.headers['Authorization'] = WP_AUTH_HEADER
+_WP_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+)
+WP_SESSION.mount('https://', _WP_ADAPTER)
+WP_SESSION.mount('http://', _WP_ADAPTER)
+
+# Number of concurrent author searches in prefetch_author_ids
+AUTHOR_LOOKUP_WORKERS = 4
+
+# WordPress lookups that every row repeats, memoized for the run:
+# author ID by primary author name, and the site's category list
+_author_ids = {}
+_wp_categories = None
+
+def find_author_id(primary_author):
+    """Search WordPress users by name and return the best match's ID, or None."""
+    # Use the specific users endpoint
+    users_endpoint = f'{CONFIG.wp_url}/wp/v2/users'
+
+    # Search for the primary author
+    params = {'search': primary_author}
+    response = WP_SESSION.get(
+        users_endpoint,
+        params=params,
+        timeout=10
+    )
+
+    if response.status_code == 200:
+        users = response.json()
+        if users:
+            # Look for exact match first (case-insensitive)
+            for user in users:
+                if user['name'].lower() == primary_author.lower():
+                    print(f"Found exact match for primary author '{primary_author}' with ID: {user['id']}")
+                    return user['id']
+
+            # If no exact match, return first result
+            print(f"Found partial match for primary author '{primary_author}' with ID: {users[0]['id']}")
+            return users[0]['id']
+    return None
+
+def prefetch_author_ids(author_names):
+    """
+    Look up the primary author of every given author string concurrently,
+    so the per-row get_or_create_author_id calls are answered from memory.
+    Authors that are not found are left for get_or_create_author_id to
+    create when (and if) their post is actually made.
+    """
+    names = [name.split(',')[0].strip() for name in author_names if name]
+    names = [name for name in dict.fromkeys(names) if name and name not in _author_ids]
+    if not names:
+        return
+
+    def lookup(name):
+        try:
+            return find_author_id(name)
+        except Exception as e:
+            print(f"Error searching for author: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=AUTHOR_LOOKUP_WORKERS) as pool:
+        for name, author_id in zip(names, pool.map(lookup, names)):
+            if author_id:
+                _author_ids[name] = author_id
 
 def get_or_create_author_id(author_name):
     """
@@ -28,38 +104,17 @@ def get_or_create_author_id(author_name):
             print(f"WARNING: Multiple authors detected: {author_name}")
             print(f"Using primary author '{primary_author}'. Please manually add these co-authors: {', '.join(co_authors)}")
 
-        headers = {
-            'Authorization': f'Basic {b64encode(f"{WP_USER}:{WP_PASSWORD}".encode()).decode()}'
-        }
-
-        # Use the specific users endpoint
-        users_endpoint = f'{WP_URL}/wp/v2/users'
+        if primary_author in _author_ids:
+            return _author_ids[primary_author]
 
-        # Search for the primary author
-        params = {'search': primary_author}
-        response = requests.get(
-            users_endpoint,
-            headers=headers,
-            params=params,
-            timeout=10
-        )
-
-        if response.status_code == 200:
-            users = response.json()
-            if users:
-                # Look for exact match first (case-insensitive)
-                for user in users:
-                    if user['name'].lower() == primary_author.lower():
-                        print(f"Found exact match for primary author '{primary_author}' with ID: {user['id']}")
-                        return user['id']
-
-                # If no exact match, return first result
-                print(f"Found partial match for primary author '{primary_author}' with ID: {users[0]['id']}")
-                return users[0]['id']
-                
-        # If we get here, the author was not found
-        print(f"Author '{primary_author}' not found. Creating new user...")
-        return create_wordpress_user(primary_author)
+        author_id = find_author_id(primary_author)
+        if not author_id:
+            # If we get here, the author was not found
+            print(f"Author '{primary_author}' not found. Creating new user...")
+            author_id = create_wordpress_user(primary_author)
+        if author_id:
+            _author_ids[primary_author] = author_id
+        return author_id
 
     except Exception as e:
         print(f"Error searching for author: {e}")
@@ -99,15 +154,9 @@ def create_wordpress_user(full_name):
         }
         
         # Send request to WordPress API
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Basic {b64encode(f"{WP_USER}:{WP_PASSWORD}".encode()).decode()}'
-        }
-        
-        response = requests.post(
-            f'{WP_URL}/wp/v2/users',
+        response = WP_SESSION.post(
+            f'{CONFIG.wp_url}/wp/v2/users',
             json=user_data,
-            headers=headers,
             timeout=15
         )
         
@@ -127,32 +176,39 @@ def create_wordpress_user(full_name):
         print(f"Error creating WordPress user: {e}")
         return None
 
-def get_category_ids(categories_list):
-    """Search WordPress categories by name and return their IDs."""
-    try:
-        headers = {
-            'Authorization': f'Basic {b64encode(f"{WP_USER}:{WP_PASSWORD}".encode()).decode()}'
-        }
-
-        category_ids = []
-
+def get_wordpress_categories():
+    """
+    Return the site's categories, fetched once per run; None if the
+    request fails (it is then retried on the next call).
+    """
+    global _wp_categories
+    if _wp_categories is None:
         # Use the categories endpoint
-        categories_endpoint = f'{WP_URL}/wp/v2/categories'
-        
+        categories_endpoint = f'{CONFIG.wp_url}/wp/v2/categories'
+
         # Get all categories first (to avoid multiple API calls)
-        response = requests.get(
+        response = WP_SESSION.get(
             categories_endpoint,
-            headers=headers,
             params={'per_page': 100},  # Increase if you have more categories
             timeout=10
         )
-        
+
         if response.status_code != 200:
             print(f"Failed to fetch categories. Response: {response.text}")
+            return None
+
+        _wp_categories = response.json()
+        print(f"Found {len(_wp_categories)} total categories in WordPress")
+    return _wp_categories
+
+def get_category_ids(categories_list):
+    """Search WordPress categories by name and return their IDs."""
+    try:
+        category_ids = []
+
+        all_categories = get_wordpress_categories()
+        if all_categories is None:
             return []
-            
-        all_categories = response.json()
-        print(f"Found {len(all_categories)} total categories in WordPress")
 
         # Process each requested category
         for name in categories_list:
@@ -280,16 +336,10 @@ def create_wordpress_post_with_details(content_data, status='draft'):
             post_data['featured_media'] = content_data['featured_media_id']
             print(f"Setting featured image ID: {content_data['featured_media_id']}")
 
-        headers = {
-            'Content-Type': 'application/json',
-        }
-
         # Send request to WordPress API
-        response = requests.post(
-            f'{WP_URL}/wp/v2/posts',
+        response = WP_SESSION.post(
+            f'{CONFIG.wp_url}/wp/v2/posts',
             json=post_data,
-            auth=(WP_USER, WP_PASSWORD),
-            headers=headers,
             timeout=30
         )
 
@@ -300,14 +350,17 @@ def create_wordpress_post_with_details(content_data, status='draft'):
             result['post_url'] = post_data.get('link')
             print(f"Successfully created post as '{status}': {post_data.get('link')}")
 
-            # Verify post details
-            verify_response = requests.get(
-                f'{WP_URL}/wp/v2/posts/{post_data["id"]}',
-                auth=(WP_USER, WP_PASSWORD)
-            )
-            if verify_response.status_code == 200:
-                verify_data = verify_response.json()
+            # Verify post details from the created post; with VERIFY_POSTS
+            # set, read the post back from WordPress instead
+            verify_data = post_data
+            if CONFIG.verify_posts:
+                verify_response = WP_SESSION.get(
+                    f'{CONFIG.wp_url}/wp/v2/posts/{post_data["id"]}',
+                    timeout=30
+                )
+                verify_data = verify_response.json() if verify_response.status_code == 200 else None
 
+            if verify_data is not None:
                 # Verify featured image
                 if content_data.get('featured_media_id'):
                     if verify_data.get('featured_media') == content_data['featured_media_id']:
@@ -323,7 +376,7 @@ def create_wordpress_post_with_details(content_data, status='draft'):
                         print("Categories successfully set and verified")
                     else:
                         print("Warning: Categories may not have been set correctly")
-                        
+
             return result
         else:
             result['error'] = f"HTTP {response.status_code}: {response.text}"